@@ -0,0 +1,215 @@
+import argparse
+import asyncio
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+from collections import defaultdict
+
+from aiohttp import ClientSession, web
+from eth_account import Account as Keypair
+from loguru import logger
+
+sys.path.append(os.path.realpath("."))
+
+from benchmarks.chain import ChainSimulator
+from benchmarks.mock_api import MockMintAPI
+from benchmarks.mock_rpc import MockRPC
+
+
+MODULES = (
+    "rewards",
+    "only_rewards",
+    "tasks",
+    "fix_sign",
+    "mint_comm_nft",
+    "mint_flag",
+    "mint_shop",
+    "mint_air3",
+    "mint_supermint",
+    "mint_summer_nft",
+    "mint_owlto_summer_nft",
+    "mint_omnihub_summer_nft",
+    "find_and_steal_other_trees_rewards",
+)
+
+MINT_URLS = ("https://www.mintchain.io/api", "https://mpapi.mintchain.io/api")
+
+
+def serve(args: argparse.Namespace) -> None:
+    async def main():
+        api = MockMintAPI(latency=args.api_latency / 1000, error_rate=args.api_error_rate)
+        chain = ChainSimulator(block_time=args.block_time)
+        if args.revert_rate:
+            chain.revert_calls(rate=args.revert_rate)
+
+        rpc = MockRPC(chain, latency=args.rpc_latency / 1000, error_rate=args.rpc_error_rate)
+
+        for app, port in ((api.application(), args.api_port), (rpc.application(), args.rpc_port)):
+            runner = web.AppRunner(app, access_log=None)
+            await runner.setup()
+            await web.TCPSite(runner, "127.0.0.1", port).start()
+
+        await asyncio.Event().wait()
+
+    asyncio.run(main())
+
+
+async def wait_for_servers(args: argparse.Namespace, timeout: float = 10) -> None:
+    deadline = time.monotonic() + timeout
+    async with ClientSession() as session:
+        while True:
+            try:
+                async with session.post(
+                    f"http://127.0.0.1:{args.rpc_port}/",
+                    json={"jsonrpc": "2.0", "id": 1, "method": "eth_chainId", "params": []},
+                ):
+                    return
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise
+                await asyncio.sleep(0.1)
+
+
+def percentile(samples: list[float], percent: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+async def run_benchmark(args: argparse.Namespace) -> None:
+    from loader import config, state
+    from models import Account
+    from core.api import MintChainAPI
+    from core.bot import Bot
+    from core.metrics import API_ERRORS, HTTP_REQUESTS, RPC_REQUESTS, STEPS, TRANSACTIONS
+    from core.tracing import tracer
+
+    api_url = f"http://127.0.0.1:{args.api_port}/api"
+
+    class BenchmarkBot(Bot):
+        async def send_request(self, *request_args, url: str = None, **kwargs):
+            # absolute Mint URLs (twitter verify, airdrop sign) go to the mock as well
+            if url:
+                for mint_url in MINT_URLS:
+                    url = url.replace(mint_url, api_url)
+
+            return await super().send_request(*request_args, url=url, **kwargs)
+
+    MintChainAPI.API_URL = api_url
+    config.mint_rpc_url = f"http://127.0.0.1:{args.rpc_port}/"
+    config.module = "pipeline" if args.pipeline else args.module
+    config.pipeline = args.pipeline or []
+    config.min_delay_before_start = config.max_delay_before_start = 0
+    config.receipt_poll_interval = min(config.receipt_poll_interval, args.block_time or 0.1)
+    config.accounts = [
+        Account(auth_token=f"bench-{index}", pk_or_mnemonic=Keypair.create().key.hex())
+        for index in range(args.accounts)
+    ]
+    state.path = ":memory:"
+    tracer.enabled = True
+
+    if args.sleep_scale != 1:
+        original_sleep = asyncio.sleep
+
+        async def scaled_sleep(delay, result=None):
+            return await original_sleep(delay * args.sleep_scale, result)
+
+        asyncio.sleep = scaled_sleep
+
+    semaphore = asyncio.Semaphore(args.threads)
+    trees_per_account = max(MockMintAPI.TOTAL_USERS // 100 // args.accounts, 1)
+
+    async def run_account(index: int, account: Account) -> None:
+        async with semaphore:
+            bot = BenchmarkBot(account)
+            if args.module == "find_and_steal_other_trees_rewards":
+                start = 1 + index * trees_per_account
+
+                async def find_and_steal_rewards():
+                    return await bot.process_find_and_steal_rewards(
+                        start, start + trees_per_account
+                    )
+
+                tracer.set_account(account.auth_token)
+                await bot.run_step(find_and_steal_rewards)
+            else:
+                await bot.start()
+
+    started = time.perf_counter()
+    await asyncio.gather(*[run_account(index, account) for index, account in enumerate(config.accounts)])
+    elapsed = time.perf_counter() - started
+
+    step_latencies: dict[str, list[float]] = defaultdict(list)
+    for event in tracer.events:
+        if event["cat"] == "step":
+            step_latencies[event["name"]].append(event["dur"] / 1_000_000)
+
+    print(
+        f"\nModule: {' -> '.join(args.pipeline) if args.pipeline else args.module} | Accounts: {args.accounts} | Threads: {args.threads} | "
+        f"API latency: {args.api_latency}ms, errors: {args.api_error_rate:.0%} | "
+        f"RPC latency: {args.rpc_latency}ms, errors: {args.rpc_error_rate:.0%} | Block time: {args.block_time}s | "
+        f"Reverts: {args.revert_rate:.0%}\n"
+    )
+    print(f"{'Elapsed':<24} {elapsed:>10.2f} s")
+    print(f"{'Accounts/minute':<24} {args.accounts / elapsed * 60:>10.1f}")
+    print(f"{'API requests/account':<24} {HTTP_REQUESTS.total() / args.accounts:>10.1f}")
+    print(f"{'API errors':<24} {API_ERRORS.total():>10.0f}")
+    print(f"{'RPC requests/account':<24} {RPC_REQUESTS.total() / args.accounts:>10.1f}")
+    print(f"{'Transactions':<24} {TRANSACTIONS.total():>10.0f}")
+    print(f"{'Reverted transactions':<24} {TRANSACTIONS.total(status='reverted'):>10.0f}\n")
+
+    print(f"{'Step':<36} {'runs':>6} {'failed':>7} {'p50 (s)':>9} {'p99 (s)':>9}")
+    for step, samples in step_latencies.items():
+        print(
+            f"{step:<36} {len(samples):>6} {STEPS.total(step=step, result='failed'):>7.0f} "
+            f"{statistics.median(samples):>9.3f} {percentile(samples, 99):>9.3f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Runs bot modules against a local mock of the Mint API and chain"
+    )
+    parser.add_argument("--module", choices=MODULES, default="rewards")
+    parser.add_argument(
+        "--pipeline",
+        nargs="+",
+        choices=MODULES[:-1],
+        metavar="MODULE",
+        help="run these modules per account with a single login instead of --module",
+    )
+    parser.add_argument("--accounts", type=int, default=50)
+    parser.add_argument("--threads", type=int, default=10)
+    parser.add_argument("--api-latency", type=float, default=100, help="mean Mint API latency (ms)")
+    parser.add_argument("--api-error-rate", type=float, default=0.0, help="share of failed Mint API requests (0-1)")
+    parser.add_argument("--rpc-latency", type=float, default=50, help="mean RPC latency (ms)")
+    parser.add_argument("--rpc-error-rate", type=float, default=0.0, help="share of failed RPC requests (0-1)")
+    parser.add_argument("--block-time", type=float, default=1.0, help="seconds between blocks (0 = mine on send)")
+    parser.add_argument("--revert-rate", type=float, default=0.0, help="share of reverted transactions (0-1)")
+    parser.add_argument(
+        "--sleep-scale",
+        type=float,
+        default=1.0,
+        help="multiplier for the bot's own sleeps (0 = skip them and measure the request path only)",
+    )
+    parser.add_argument("--api-port", type=int, default=18545)
+    parser.add_argument("--rpc-port", type=int, default=18546)
+    parser.add_argument("--verbose", action="store_true", help="show the bot logs")
+    args = parser.parse_args()
+
+    logger.remove()
+    if args.verbose:
+        logger.add(sys.stdout, level="DEBUG")
+
+    servers = multiprocessing.Process(target=serve, args=(args,), daemon=True)
+    servers.start()
+    try:
+        asyncio.run(wait_for_servers(args))
+        asyncio.run(run_benchmark(args))
+    finally:
+        servers.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+import asyncio
+import random
+import time
+from collections import defaultdict
+from typing import Any
+
+from eth_account import Account
+from eth_account._utils.legacy_transactions import Transaction
+from eth_account._utils.typed_transactions import TypedTransaction
+from eth_utils import keccak
+from web3.providers.async_base import AsyncBaseProvider
+from web3.types import RPCEndpoint, RPCResponse
+
+
+class ChainError(Exception):
+    def __init__(self, message: str, code: int = -32000):
+        super().__init__(message)
+        self.code = code
+
+
+def _hex(value: Any) -> str:
+    return value if isinstance(value, str) else "0x" + bytes(value).hex()
+
+
+class ChainSimulator:
+    """
+    In-memory EVM chain for offline transaction tests: accepts signed raw transactions, validates chain id,
+    nonces and balances like a node mempool (too low / replacement / queued gaps), mines blocks every
+    `block_time` seconds (or on every send when 0) and reverts transactions on demand.
+    Contracts are not executed - every call with data uses `execution_gas` and returns an empty word.
+    """
+
+    INTRINSIC_GAS = 21_000
+    PRICE_BUMP = 1.1
+
+    def __init__(
+        self,
+        chain_id: int = 185,
+        block_time: float = 1.0,
+        gas_price: int = 1_000_000,
+        initial_balance: int = 10**18,
+        block_gas_limit: int = 30_000_000,
+        execution_gas: int = 30_000,
+    ):
+        self.chain_id = chain_id
+        self.block_time = block_time
+        self.gas_price = gas_price
+        self.initial_balance = initial_balance
+        self.block_gas_limit = block_gas_limit
+        self.execution_gas = execution_gas
+
+        self.balances: dict[str, int] = defaultdict(lambda: self.initial_balance)
+        self.nonces: dict[str, int] = defaultdict(int)
+        self.pool: dict[str, dict[int, dict]] = defaultdict(dict)
+
+        self.blocks: list[dict] = []
+        self.transactions: dict[str, dict] = {}
+        self.receipts: dict[str, dict] = {}
+
+        self.revert_rules: list[dict] = []
+        self.forced_reverts = 0
+        self.mine()
+
+    # ---- state ----
+
+    def fund(self, address: str, amount: int) -> None:
+        self.balances[address.lower()] = amount
+
+    def balance(self, address: str) -> int:
+        return self.balances[address.lower()]
+
+    def nonce(self, address: str, pending: bool = False) -> int:
+        address = address.lower()
+        nonce = self.nonces[address]
+        if pending:
+            while nonce in self.pool[address]:
+                nonce += 1
+
+        return nonce
+
+    # ---- reverts ----
+
+    def revert_calls(self, to: str = None, selector: str = None, rate: float = 1.0) -> None:
+        """Reverts mined transactions sent to `to` and/or calling `selector` (0x-prefixed 4 bytes) at `rate`"""
+        self.revert_rules.append(
+            {"to": to.lower() if to else None, "selector": selector, "rate": rate}
+        )
+
+    def revert_next(self, count: int = 1) -> None:
+        self.forced_reverts += count
+
+    def clear_reverts(self) -> None:
+        self.revert_rules.clear()
+        self.forced_reverts = 0
+
+    def should_revert(self, trx: dict) -> bool:
+        if self.forced_reverts:
+            self.forced_reverts -= 1
+            return True
+
+        for rule in self.revert_rules:
+            if rule["to"] and rule["to"] != trx["to"]:
+                continue
+            if rule["selector"] and not trx["input"].startswith(rule["selector"]):
+                continue
+            if random.random() < rule["rate"]:
+                return True
+
+        return False
+
+    # ---- transactions ----
+
+    def intrinsic_gas(self, data: bytes) -> int:
+        return self.INTRINSIC_GAS + sum(16 if byte else 4 for byte in data)
+
+    def gas_used(self, data: bytes) -> int:
+        return self.intrinsic_gas(data) + (self.execution_gas if data else 0)
+
+    def decode(self, raw_transaction: bytes) -> dict:
+        if raw_transaction[0] < 0x80:
+            fields = TypedTransaction.from_bytes(raw_transaction).as_dict()
+            chain_id = fields["chainId"]
+            gas_price = fields.get("gasPrice") or min(
+                fields["maxFeePerGas"], self.gas_price + fields["maxPriorityFeePerGas"]
+            )
+            transaction_type = fields["type"]
+        else:
+            fields = Transaction.from_bytes(raw_transaction).as_dict()
+            chain_id = (fields["v"] - 35) // 2 if fields["v"] >= 35 else None
+            gas_price = fields["gasPrice"]
+            transaction_type = 0
+
+        if chain_id is not None and chain_id != self.chain_id:
+            raise ChainError(f"invalid chain id: have {chain_id}, want {self.chain_id}")
+
+        data = bytes(fields["data"])
+        return {
+            "hash": "0x" + keccak(raw_transaction).hex(),
+            "from": Account.recover_transaction(raw_transaction).lower(),
+            "to": _hex(fields["to"]).lower() if fields["to"] else None,
+            "nonce": fields["nonce"],
+            "gas": fields["gas"],
+            "gasPrice": gas_price,
+            "value": fields["value"],
+            "input": "0x" + data.hex(),
+            "data": data,
+            "type": transaction_type,
+        }
+
+    def send_raw_transaction(self, raw_transaction: bytes) -> str:
+        trx = self.decode(raw_transaction)
+        sender = trx["from"]
+
+        if trx["nonce"] < self.nonces[sender]:
+            raise ChainError("nonce too low")
+
+        if trx["gas"] < self.intrinsic_gas(trx["data"]):
+            raise ChainError("intrinsic gas too low")
+
+        if trx["gas"] * trx["gasPrice"] + trx["value"] > self.balances[sender]:
+            raise ChainError("insufficient funds for gas * price + value")
+
+        replaced = self.pool[sender].get(trx["nonce"])
+        if replaced is not None:
+            if trx["hash"] == replaced["hash"]:
+                raise ChainError("already known")
+            if trx["gasPrice"] < replaced["gasPrice"] * self.PRICE_BUMP:
+                raise ChainError("replacement transaction underpriced")
+
+            self.transactions.pop(replaced["hash"], None)
+
+        self.pool[sender][trx["nonce"]] = trx
+        self.transactions[trx["hash"]] = trx
+        if not self.block_time:
+            self.mine()
+
+        return trx["hash"]
+
+    def estimate_gas(self, call: dict) -> int:
+        data = bytes.fromhex((call.get("data") or call.get("input") or "0x").removeprefix("0x"))
+        value = int(call.get("value", "0x0"), 16)
+        if call.get("from") and value > self.balance(call["from"]):
+            raise ChainError("insufficient funds for transfer")
+
+        return self.gas_used(data)
+
+    def _execute(self, trx: dict, block: dict, index: int, cumulative_gas: int) -> dict:
+        sender = trx["from"]
+        gas_used = min(self.gas_used(trx["data"]), trx["gas"])
+        status = 1
+        if gas_used < self.gas_used(trx["data"]) or self.should_revert(trx):
+            status = 0
+
+        self.balances[sender] -= gas_used * trx["gasPrice"]
+        if status and trx["value"]:
+            self.balances[sender] -= trx["value"]
+            if trx["to"]:
+                self.balances[trx["to"]] += trx["value"]
+
+        self.nonces[sender] += 1
+        trx.update(
+            {"blockHash": block["hash"], "blockNumber": block["number"], "transactionIndex": hex(index)}
+        )
+        return {
+            "transactionHash": trx["hash"],
+            "transactionIndex": hex(index),
+            "blockHash": block["hash"],
+            "blockNumber": block["number"],
+            "from": sender,
+            "to": trx["to"],
+            "cumulativeGasUsed": hex(cumulative_gas + gas_used),
+            "gasUsed": hex(gas_used),
+            "effectiveGasPrice": hex(trx["gasPrice"]),
+            "contractAddress": None,
+            "logs": [],
+            "logsBloom": "0x" + "00" * 256,
+            "status": hex(status),
+            "type": hex(trx["type"]),
+        }
+
+    def mine(self) -> dict:
+        number = len(self.blocks)
+        block = {
+            "number": hex(number),
+            "hash": "0x" + keccak(b"block" + number.to_bytes(32, "big")).hex(),
+            "parentHash": self.blocks[-1]["hash"] if self.blocks else "0x" + "00" * 32,
+            "timestamp": hex(int(time.time())),
+            "gasLimit": hex(self.block_gas_limit),
+            "baseFeePerGas": hex(self.gas_price),
+            "miner": "0x" + "00" * 20,
+            "transactions": [],
+        }
+
+        gas = 0
+        for sender in list(self.pool):
+            pending = self.pool[sender]
+            while self.nonces[sender] in pending:
+                trx = pending[self.nonces[sender]]
+                if gas + trx["gas"] > self.block_gas_limit:
+                    break
+
+                if trx["gas"] * trx["gasPrice"] + trx["value"] > self.balances[sender]:
+                    # funds were spent by an earlier transaction - drop it like a node would
+                    del pending[self.nonces[sender]]
+                    self.transactions.pop(trx["hash"], None)
+                    break
+
+                del pending[self.nonces[sender]]
+                receipt = self._execute(trx, block, len(block["transactions"]), gas)
+                self.receipts[trx["hash"]] = receipt
+                block["transactions"].append(trx["hash"])
+                gas += int(receipt["gasUsed"], 16)
+
+            if not pending:
+                del self.pool[sender]
+
+        block["gasUsed"] = hex(gas)
+        self.blocks.append(block)
+        return block
+
+    async def produce_blocks(self) -> None:
+        while self.block_time:
+            await asyncio.sleep(self.block_time)
+            self.mine()
+
+    # ---- JSON-RPC ----
+
+    def _block(self, tag: str) -> dict | None:
+        if tag in ("latest", "pending", "safe", "finalized"):
+            return self.blocks[-1]
+
+        number = 0 if tag == "earliest" else int(tag, 16)
+        return self.blocks[number] if 0 <= number < len(self.blocks) else None
+
+    @staticmethod
+    def _transaction(trx: dict | None) -> dict | None:
+        if trx is None:
+            return None
+
+        return {
+            key: hex(value) if isinstance(value, int) else value
+            for key, value in trx.items()
+            if key != "data"
+        }
+
+    def call(self, method: str, params: list) -> Any:
+        handlers = {
+            "eth_chainId": lambda: hex(self.chain_id),
+            "net_version": lambda: str(self.chain_id),
+            "eth_gasPrice": lambda: hex(self.gas_price),
+            "eth_maxPriorityFeePerGas": lambda: hex(0),
+            "eth_estimateGas": lambda: hex(self.estimate_gas(params[0])),
+            "eth_getBalance": lambda: hex(self.balance(params[0])),
+            "eth_getTransactionCount": lambda: hex(
+                self.nonce(params[0], pending=len(params) > 1 and params[1] == "pending")
+            ),
+            "eth_getCode": lambda: "0x",
+            "eth_call": lambda: "0x" + "00" * 32,
+            "eth_blockNumber": lambda: hex(len(self.blocks) - 1),
+            "eth_getBlockByNumber": lambda: self._block(params[0]),
+            "eth_getBlockByHash": lambda: next(
+                (block for block in self.blocks if block["hash"] == params[0]), None
+            ),
+            "eth_getBlockReceipts": lambda: (
+                [self.receipts[tx_hash] for tx_hash in block["transactions"]]
+                if (block := self._block(params[0]))
+                else None
+            ),
+            "eth_getTransactionByHash": lambda: self._transaction(self.transactions.get(params[0])),
+            "eth_getTransactionReceipt": lambda: self.receipts.get(params[0]),
+            "eth_sendRawTransaction": lambda: self.send_raw_transaction(
+                bytes.fromhex(params[0].removeprefix("0x"))
+            ),
+        }
+
+        if method not in handlers:
+            raise ChainError(f"Method not found: {method}", code=-32601)
+
+        return handlers[method]()
+
+    def provider(self) -> "SimulatedProvider":
+        return SimulatedProvider(self)
+
+
+class SimulatedProvider(AsyncBaseProvider):
+    """Async web3 provider answering from a ChainSimulator in-process (no HTTP)"""
+
+    def __init__(self, chain: ChainSimulator, latency: float = 0.0):
+        super().__init__()
+        self.chain = chain
+        self.latency = latency
+        self.endpoint_uri = f"simulator://{chain.chain_id}/{id(chain)}"
+
+    async def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        try:
+            return {"jsonrpc": "2.0", "id": 0, "result": self.chain.call(method, list(params))}
+        except ChainError as error:
+            return {"jsonrpc": "2.0", "id": 0, "error": {"code": error.code, "message": str(error)}}
+
+    async def is_connected(self, show_traceback: bool = False) -> bool:
+        return True
+
@@ -0,0 +1,209 @@
+import asyncio
+import os
+import random
+
+from aiohttp import web
+
+
+class MockUser:
+    def __init__(self, user_id: int, address: str):
+        self.id = user_id
+        self.address = address
+        self.energy = 500
+        self.tree = 0
+        self.daily_claimed = False
+        self.boxes = [{"id": user_id * 10 + index, "opened": False} for index in range(2)]
+
+
+class MockMintAPI:
+    """
+    Local stand-in of the Mint Forest API (https://www.mintchain.io/api/tree/*) with the responses the bot expects.
+    Every request waits `latency` seconds (+-50%) and fails with a Mint error code at `error_rate`.
+    """
+
+    TOTAL_USERS = 10_000
+
+    def __init__(self, latency: float = 0.0, error_rate: float = 0.0):
+        self.latency = latency
+        self.error_rate = error_rate
+
+        self.users: dict[str, MockUser] = {}
+        self.tokens: dict[str, MockUser] = {}
+
+    @staticmethod
+    def ok(result=None) -> web.Response:
+        return web.json_response({"code": 10000, "result": result, "msg": "ok"})
+
+    @staticmethod
+    def forest_proof(amount: int) -> dict:
+        return {"tx": "0x" + os.urandom(68).hex(), "energy": amount, "amount": amount}
+
+    def user(self, request: web.Request) -> MockUser:
+        token = request.headers.get("authorization", "").replace("Bearer ", "")
+        if token not in self.tokens:
+            raise web.HTTPUnauthorized()
+
+        return self.tokens[token]
+
+    def user_info(self, user: MockUser, tree_id: int = None) -> dict:
+        return {
+            "id": tree_id or user.id,
+            "treeId": tree_id or user.id,
+            "address": user.address,
+            "energy": user.energy,
+            "tree": user.tree,
+            "inviteId": 1,
+            "signin": 1,
+            "createdAt": "2024-06-01T00:00:00.000Z",
+            "stealCount": 0,
+        }
+
+    @web.middleware
+    async def middleware(self, request: web.Request, handler) -> web.Response:
+        if self.latency:
+            await asyncio.sleep(random.uniform(0.5, 1.5) * self.latency)
+
+        if random.random() < self.error_rate:
+            return web.json_response({"code": 50000, "result": None, "msg": "Simulated error"})
+
+        return await handler(request)
+
+    async def login(self, request: web.Request) -> web.Response:
+        data = await request.json()
+        address = data["address"]
+        if address not in self.users:
+            self.users[address] = MockUser(len(self.users) + 1, address)
+
+        token = os.urandom(16).hex()
+        user = self.tokens[token] = self.users[address]
+        return self.ok(
+            {
+                "access_token": token,
+                "user": {
+                    "id": user.id,
+                    "address": address,
+                    "status": "verified",
+                    "inviteId": 1,
+                    "twitter": "mock",
+                    "discord": None,
+                },
+            }
+        )
+
+    async def energy_list(self, request: web.Request) -> web.Response:
+        user = self.user(request)
+        return self.ok(
+            [
+                {
+                    "uid": [],
+                    "amount": 250,
+                    "includes": [],
+                    "type": "daily",
+                    "freeze": user.daily_claimed,
+                }
+            ]
+        )
+
+    async def steal_energy_list(self, request: web.Request) -> web.Response:
+        user_id = int(request.query.get("id", 0))
+        return self.ok(
+            [
+                {
+                    "uid": [str(user_id)],
+                    "amount": random.randint(10, 500),
+                    "includes": [user_id],
+                    "type": "steal",
+                    "stealable": random.random() < 0.3,
+                }
+            ]
+        )
+
+    async def claim(self, request: web.Request) -> web.Response:
+        user = self.user(request)
+        data = await request.json()
+        user.daily_claimed = True
+        user.energy += data.get("amount", 0)
+        return self.ok(data.get("amount", 0))
+
+    async def asset(self, request: web.Request) -> web.Response:
+        user = self.user(request)
+        return self.ok(
+            [
+                {
+                    "id": box["id"],
+                    "uid": user.id,
+                    "reward": 100,
+                    "type": "energy",
+                    "createdAt": "2024-06-01T00:00:00.000Z" if box["opened"] else None,
+                }
+                for box in user.boxes
+            ]
+        )
+
+    async def me_rank(self, request: web.Request) -> web.Response:
+        user = self.user(request)
+        return self.ok(
+            {"id": user.id, "address": user.address, "ens": None, "amount": user.tree, "role": "normal", "rank": user.id}
+        )
+
+    async def get_user_info(self, request: web.Request) -> web.Response:
+        user = self.user(request)
+        tree_id = request.query.get("treeid")
+        return self.ok(self.user_info(user, int(tree_id) if tree_id else None))
+
+    async def inject(self, request: web.Request) -> web.Response:
+        user = self.user(request)
+        data = await request.json()
+        user.tree += data["energy"]
+        user.energy = max(user.energy - data["energy"], 0)
+        return web.json_response({"code": 10000, "result": True, "msg": "ok"})
+
+    async def task_list(self, request: web.Request) -> web.Response:
+        return self.ok(
+            [
+                {"id": 1, "name": "Join Telegram", "amount": 100, "isFreeze": False, "spec": "telegram-join", "claimed": False},
+                {"id": 2, "name": "Visit Mint", "amount": 100, "isFreeze": False, "spec": "visit", "claimed": False},
+                {"id": 3, "name": "Stake", "amount": 100, "isFreeze": False, "spec": "stake", "claimed": False},
+            ]
+        )
+
+    async def get_forest_proof(self, request: web.Request) -> web.Response:
+        user = self.user(request)
+        proof_type = request.query.get("type")
+        if proof_type == "OpenReward":
+            box_id = int(request.query.get("boxId", 0))
+            for box in user.boxes:
+                if box["id"] == box_id:
+                    box["opened"] = True
+
+        return self.ok(self.forest_proof(random.randint(10, 300)))
+
+    async def empty(self, request: web.Request) -> web.Response:
+        self.user(request)
+        return self.ok({})
+
+    async def total_user(self, request: web.Request) -> web.Response:
+        return self.ok(self.TOTAL_USERS)
+
+    async def airdrop_sign(self, request: web.Request) -> web.Response:
+        return web.json_response({"code": 200, "result": True, "msg": "ok"})
+
+    def application(self) -> web.Application:
+        app = web.Application(middlewares=[self.middleware])
+        app.router.add_post("/api/tree/login", self.login)
+        app.router.add_get("/api/tree/energy-list", self.energy_list)
+        app.router.add_get("/api/tree/steal/energy-list", self.steal_energy_list)
+        app.router.add_post("/api/tree/claim", self.claim)
+        app.router.add_get("/api/tree/asset", self.asset)
+        app.router.add_get("/api/tree/me-rank", self.me_rank)
+        app.router.add_get("/api/tree/user-info", self.get_user_info)
+        app.router.add_post("/api/tree/inject", self.inject)
+        app.router.add_get("/api/tree/task-list", self.task_list)
+        app.router.add_post("/api/tree/task-submit", self.empty)
+        app.router.add_get("/api/tree/green-id", self.empty)
+        app.router.add_get("/api/tree/fix-sign", self.empty)
+        app.router.add_post("/api/wallet/verify", self.empty)
+        app.router.add_get("/api/tree/get-forest-proof", self.get_forest_proof)
+        app.router.add_get("/api/tree/total-user", self.total_user)
+        app.router.add_get("/api/user/sign", self.airdrop_sign)
+        return app
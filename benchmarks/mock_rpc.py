@@ -0,0 +1,51 @@
+import asyncio
+import random
+
+from aiohttp import web
+
+from .chain import ChainError, ChainSimulator
+
+
+class MockRPC:
+    """JSON-RPC server in front of a ChainSimulator with configurable latency and error rate"""
+
+    def __init__(self, chain: ChainSimulator, latency: float = 0.0, error_rate: float = 0.0):
+        self.chain = chain
+        self.latency = latency
+        self.error_rate = error_rate
+
+    async def handle(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        if self.latency:
+            await asyncio.sleep(random.uniform(0.5, 1.5) * self.latency)
+
+        if isinstance(payload, list):
+            return web.json_response([self.call(item) for item in payload])
+
+        return web.json_response(self.call(payload))
+
+    def call(self, payload: dict) -> dict:
+        response = {"jsonrpc": "2.0", "id": payload.get("id")}
+        if random.random() < self.error_rate:
+            response["error"] = {"code": -32000, "message": "Simulated RPC error"}
+            return response
+
+        try:
+            response["result"] = self.chain.call(payload["method"], payload.get("params") or [])
+        except ChainError as error:
+            response["error"] = {"code": error.code, "message": str(error)}
+
+        return response
+
+    def application(self) -> web.Application:
+        async def start_block_production(app: web.Application):
+            app["blocks"] = asyncio.create_task(self.chain.produce_blocks())
+
+        async def stop_block_production(app: web.Application):
+            app["blocks"].cancel()
+
+        app = web.Application()
+        app.router.add_post("/", self.handle)
+        app.on_startup.append(start_block_production)
+        app.on_cleanup.append(stop_block_production)
+        return app
@@ -0,0 +1,107 @@
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+from eth_account import Account
+
+sys.path.append(os.path.realpath("."))
+
+from core.signer import TransactionSigner, _sign_transaction
+
+
+def build_transactions(count: int) -> list[tuple]:
+    items = []
+    for nonce in range(count):
+        keypair = Account.create()
+        trx = {
+            "chainId": 185,
+            "to": "0x12906892AaA384ad59F2c431867af6632c68100a",
+            "value": 0,
+            "gas": 150000,
+            "gasPrice": 1000000,
+            "nonce": nonce,
+            "data": "0x" + os.urandom(196).hex(),
+        }
+        items.append((keypair, trx))
+
+    return items
+
+
+async def measure_loop_lag(stop: asyncio.Event, samples: list[float]) -> None:
+    interval = 0.005
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(time.perf_counter() - started - interval)
+
+
+async def run_case(name: str, items: list[tuple], sign: callable) -> None:
+    stop = asyncio.Event()
+    lag_samples: list[float] = []
+    heartbeat = asyncio.create_task(measure_loop_lag(stop, lag_samples))
+    await asyncio.sleep(0.05)
+
+    started = time.perf_counter()
+    await sign(items)
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await heartbeat
+
+    lag_samples.sort()
+    p99 = lag_samples[int(len(lag_samples) * 0.99) - 1] if lag_samples else 0.0
+    print(
+        f"{name:<24} | {len(items) / elapsed:>10.1f} sig/s | "
+        f"loop lag p50: {statistics.median(lag_samples or [0]) * 1000:>7.2f} ms | "
+        f"p99: {p99 * 1000:>7.2f} ms | max: {max(lag_samples or [0]) * 1000:>7.2f} ms"
+    )
+
+
+async def main(count: int, workers: int, concurrency: int) -> None:
+    items = build_transactions(count)
+    print(f"Signing {count} transactions | workers: {workers} | concurrency: {concurrency}\n")
+
+    async def inline(batch: list[tuple]) -> None:
+        for keypair, trx in batch:
+            _sign_transaction(bytes(keypair.key), trx)
+            await asyncio.sleep(0)
+
+    def concurrent(signer: TransactionSigner) -> callable:
+        async def sign(batch: list[tuple]) -> None:
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def sign_one(keypair, trx) -> None:
+                async with semaphore:
+                    await signer.sign_transaction(keypair, trx)
+
+            await asyncio.gather(*[sign_one(keypair, trx) for keypair, trx in batch])
+
+        return sign
+
+    thread_signer = TransactionSigner(workers=workers, pool="thread")
+    process_signer = TransactionSigner(workers=workers, pool="process")
+
+    # warm up pools so worker start-up isn't counted
+    await thread_signer.sign_transactions(items[:workers])
+    await process_signer.sign_transactions(items[:workers])
+
+    await run_case("inline (event loop)", items, inline)
+    await run_case("thread pool", items, concurrent(thread_signer))
+    await run_case("process pool", items, concurrent(process_signer))
+    await run_case("process pool (batch)", items, process_signer.sign_transactions)
+
+    thread_signer.shutdown()
+    process_signer.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Transaction signing throughput")
+    parser.add_argument("--count", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--concurrency", type=int, default=500)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.count, args.workers, args.concurrency))
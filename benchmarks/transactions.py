@@ -0,0 +1,104 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+from collections import Counter
+
+from eth_account import Account
+from loguru import logger
+
+sys.path.append(os.path.realpath("."))
+
+from benchmarks.chain import ChainSimulator
+
+
+async def run_wallet(wallet, count: int, mode: str, errors: Counter) -> list[bool]:
+    data = "0x" + os.urandom(196).hex()
+    statuses = []
+
+    if mode == "batch":
+        try:
+            nonce = await wallet.transactions_count()
+            transactions = await asyncio.gather(
+                *[wallet.build_forest_transaction(data, nonce=nonce + index) for index in range(count)]
+            )
+            results = await wallet.send_and_verify_transactions(list(transactions))
+            statuses.extend(status for status, _ in results)
+        except Exception as error:
+            errors[str(error)] += 1
+
+        return statuses
+
+    for _ in range(count):
+        try:
+            transaction = await wallet.build_forest_transaction(data)
+            status, _ = await wallet.send_and_verify_transaction(transaction)
+            statuses.append(status)
+        except Exception as error:
+            errors[str(error)] += 1
+
+    return statuses
+
+
+async def run_benchmark(args: argparse.Namespace) -> None:
+    from loader import config
+    from core.wallet import Wallet
+
+    chain = ChainSimulator(block_time=args.block_time)
+    if args.revert_rate:
+        chain.revert_calls(rate=args.revert_rate)
+
+    config.receipt_tracking = args.receipt_tracking
+    config.receipt_poll_interval = min(config.receipt_poll_interval, args.block_time or 0.05)
+
+    provider = chain.provider()
+    provider.latency = args.rpc_latency / 1000
+    wallets = []
+    for _ in range(args.wallets):
+        wallet = Wallet(Account.create().key.hex(), "http://127.0.0.1:1/")
+        wallet.provider = provider
+        wallets.append(wallet)
+
+    errors = Counter()
+    blocks = asyncio.create_task(chain.produce_blocks())
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *[run_wallet(wallet, args.transactions, args.mode, errors) for wallet in wallets]
+    )
+    elapsed = time.perf_counter() - started
+    blocks.cancel()
+
+    statuses = [status for wallet_statuses in results for status in wallet_statuses]
+    print(
+        f"\nMode: {args.mode} | Wallets: {args.wallets} | Transactions/wallet: {args.transactions} | "
+        f"Block time: {args.block_time}s | RPC latency: {args.rpc_latency}ms | Receipts: {args.receipt_tracking}\n"
+    )
+    print(f"{'Elapsed':<24} {elapsed:>10.2f} s")
+    print(f"{'Confirmed/s':<24} {len(statuses) / elapsed:>10.1f}")
+    print(f"{'Succeeded':<24} {sum(statuses):>10}")
+    print(f"{'Reverted':<24} {len(statuses) - sum(statuses):>10}")
+    print(f"{'Blocks':<24} {len(chain.blocks) - 1:>10}")
+    for error, count in errors.most_common():
+        print(f"{'Error':<24} {count:>10} | {error}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Load-tests the transaction path (build, sign, send, receipt) against an in-process chain simulator"
+    )
+    parser.add_argument("--mode", choices=("sequential", "batch"), default="sequential")
+    parser.add_argument("--wallets", type=int, default=20)
+    parser.add_argument("--transactions", type=int, default=5, help="transactions per wallet")
+    parser.add_argument("--block-time", type=float, default=1.0, help="seconds between blocks (0 = mine on send)")
+    parser.add_argument("--rpc-latency", type=float, default=0, help="added latency per RPC call (ms)")
+    parser.add_argument("--revert-rate", type=float, default=0.0, help="share of reverted transactions (0-1)")
+    parser.add_argument("--receipt-tracking", choices=("poll", "blocks"), default="blocks")
+    args = parser.parse_args()
+
+    logger.remove()
+    asyncio.run(run_benchmark(args))
+
+
+if __name__ == "__main__":
+    main()
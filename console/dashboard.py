@@ -0,0 +1,128 @@
+import asyncio
+import sys
+import time
+
+from colorama import Fore, Style
+
+from core.metrics import (
+    ACCOUNTS,
+    ACCOUNTS_IN_FLIGHT,
+    API_ERRORS,
+    ENERGY,
+    HTTP_REQUESTS,
+    RPC_REQUESTS,
+    TRANSACTIONS,
+)
+
+
+class Dashboard:
+    """Live progress of a module run, redrawn in place from the metrics every `refresh` seconds"""
+
+    active: "Dashboard | None" = None
+
+    def __init__(self, module: str, total: int, refresh: float = 1.0):
+        self.module = module
+        self.total = total
+        self.refresh = refresh
+
+        self._lines = 0
+        self._task: asyncio.Task | None = None
+        self._started = time.monotonic()
+        self._baseline = self.snapshot()
+        self._previous = (self._started, self._baseline)
+        self._rates = (0.0, 0.0)
+
+    @staticmethod
+    def snapshot() -> dict[str, float]:
+        return {
+            "success": ACCOUNTS.total(result="success"),
+            "failed": ACCOUNTS.total(result="failed"),
+            "requests": HTTP_REQUESTS.total() + RPC_REQUESTS.total(),
+            "api_errors": API_ERRORS.total(),
+            "transactions": TRANSACTIONS.total(),
+            "reverted": TRANSACTIONS.total(status="reverted"),
+            "energy": ENERGY.total() - ENERGY.total(type="inject"),
+            "injected": ENERGY.total(type="inject"),
+        }
+
+    def render(self) -> list[str]:
+        now = time.monotonic()
+        current = self.snapshot()
+        run = {key: value - self._baseline[key] for key, value in current.items()}
+
+        previous_time, previous = self._previous
+        interval = now - previous_time
+        if interval >= self.refresh / 2:
+            self._rates = (
+                (current["requests"] - previous["requests"]) / interval,
+                (current["transactions"] - previous["transactions"]) / interval,
+            )
+            self._previous = (now, current)
+
+        requests_rate, transactions_rate = self._rates
+
+        elapsed = now - self._started
+        done = run["success"] + run["failed"]
+        eta = "--:--:--"
+        if 0 < done < self.total:
+            eta = time.strftime("%H:%M:%S", time.gmtime(elapsed / done * (self.total - done)))
+        elif done >= self.total:
+            eta = "done"
+
+        width = 30
+        filled = int(width * done / self.total) if self.total else width
+        bar = Fore.GREEN + "█" * filled + Fore.LIGHTBLACK_EX + "░" * (width - filled)
+
+        return [
+            f"{Fore.CYAN}Module: {Fore.WHITE}{self.module}  {Fore.CYAN}Elapsed: {Fore.WHITE}"
+            f"{time.strftime('%H:%M:%S', time.gmtime(elapsed))}  {Fore.CYAN}ETA: {Fore.WHITE}{eta}",
+            f"{bar} {Fore.WHITE}{done:.0f}/{self.total}",
+            f"{Fore.GREEN}Done: {run['success']:.0f}  {Fore.RED}Failed: {run['failed']:.0f}  "
+            f"{Fore.YELLOW}In flight: {ACCOUNTS_IN_FLIGHT.total():.0f}",
+            f"{Fore.CYAN}Requests/s: {Fore.WHITE}{requests_rate:.1f}  {Fore.CYAN}API errors: {Fore.WHITE}"
+            f"{run['api_errors']:.0f}",
+            f"{Fore.CYAN}Transactions/s: {Fore.WHITE}{transactions_rate:.2f}  {Fore.CYAN}Sent: {Fore.WHITE}"
+            f"{run['transactions']:.0f}  {Fore.CYAN}Reverted: {Fore.WHITE}{run['reverted']:.0f}",
+            f"{Fore.CYAN}Energy claimed: {Fore.WHITE}{run['energy']:.0f}  {Fore.CYAN}Injected: {Fore.WHITE}"
+            f"{run['injected']:.0f}",
+        ]
+
+    def draw(self) -> None:
+        lines = self.render()
+        # move the cursor back to the first line of the previous frame and overwrite it
+        output = f"\033[{self._lines}F" if self._lines else ""
+        output += "".join(f"\033[K{line}{Style.RESET_ALL}\n" for line in lines)
+        sys.stdout.write(output)
+        sys.stdout.flush()
+        self._lines = len(lines)
+
+    async def _run(self) -> None:
+        while True:
+            self.draw()
+            await asyncio.sleep(self.refresh)
+
+    @classmethod
+    def log_sink(cls, message) -> None:
+        """Console sink for logs shown while a dashboard is running: printed above the frame, which is redrawn"""
+        dashboard = cls.active
+        if dashboard is None or not dashboard._lines:
+            sys.stdout.write(message)
+            sys.stdout.flush()
+            return
+
+        # clear the frame, print the message where it was and draw the frame again below it
+        sys.stdout.write(f"\033[{dashboard._lines}F\033[J{message}")
+        dashboard._lines = 0
+        dashboard.draw()
+
+    def start(self) -> None:
+        print()
+        Dashboard.active = self
+        self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+
+        self.draw()
+        Dashboard.active = None
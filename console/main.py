@@ -17,6 +17,7 @@ class Console:
         "Complete Tasks",
         "Mint Random All NFTs",
         "Claim Daily Rewards and Inject",
+        "Run Pipeline",
         "Find and Steal Other Trees Rewards",
         "Total Users",
         "Bridge ETH to MINT (via Comet)",
@@ -40,6 +41,7 @@ class Console:
     MODULES_DATA = {
         "Complete Tasks": "tasks",
         "Claim Daily Rewards and Inject": "rewards",
+        "Run Pipeline": "pipeline",
         "Find and Steal Other Trees Rewards": "find_and_steal_other_trees_rewards",
         "Total Users": "total_user",
         "Mint Random All NFTs": "mint_random_all_nfts",
@@ -1,5 +1,9 @@
 import asyncio
+import base64
+import json
 import random
+import time
+from urllib.parse import urlparse
 
 import httpx
 import pyuseragents
@@ -8,19 +12,35 @@ import names
 from typing import Literal, List
 from noble_tls import Session, Client
 from Jam_Twitter_API.account_async import TwitterAccountAsync
+from Jam_Twitter_API.errors import TwitterError
+from Jam_Twitter_API.util import get_headers
 
 from models import *
-from loader import config as configuration
+from loader import config as configuration, state
 from .modules.gainfi_api import GainfiAPI
 from .modules.temp_mail import TempMail
 
 from .wallet import Wallet
+from .prefetch import ForestProofPrefetcher
+from .hedging import HedgePolicy
+from .circuit import circuits
+from .metrics import API_ERRORS, ENERGY, HTTP_LATENCY, HTTP_REQUESTS
+from .tracing import tracer
 from .modules import *
-from .exceptions.base import APIError
+from .exceptions.base import APIError, CircuitOpenError
 
 
 class MintChainAPI(Wallet):
     API_URL = "https://www.mintchain.io/api"
+    HEDGED_METHODS = (
+        "/tree/user-info",
+        "/tree/energy-list",
+        "/tree/asset",
+        "/tree/me-rank",
+    )
+    hedge_policy = HedgePolicy(percentile=configuration.hedge_api_percentile)
+    # validated Twitter sessions shared by every run of the same account in this process
+    twitter_sessions: dict[str, TwitterAccountAsync] = {}
 
     def __init__(self, account_data: Account):
         super().__init__(
@@ -29,6 +49,7 @@ class MintChainAPI(Wallet):
         self.account = account_data
         self.session = self.setup_session()
         self.twitter_account: TwitterAccountAsync = None  # type: ignore
+        self.session_restored = False
 
     @property
     def jwt_token(self) -> str:
@@ -46,6 +67,12 @@ class MintChainAPI(Wallet):
     async def rank(self) -> int:
         return (await self.rank_info()).rank
 
+    @staticmethod
+    def token_expiry(token: str) -> float:
+        payload = token.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        return float(claims["exp"])
+
     def setup_session(self) -> Session:
         session = Session(client=Client.CHROME_120)
         session.random_tls_extension_order = True
@@ -76,34 +103,64 @@ class MintChainAPI(Wallet):
         def _verify_response(_response: dict) -> dict:
             if "code" in _response:
                 if _response["code"] not in (10000, 200):
+                    API_ERRORS.inc(method=method or url, code=_response["code"])
                     raise APIError(
                         f"{_response.get('msg')} | Method: {method} | URL: {url}"
                     )
 
                 return _response
 
-        if request_type == "POST":
-            if not url:
-                response = await self.session.post(
-                    f"{self.API_URL}{method}",
-                    json=json_data,
-                    params=params,
-                    headers=headers,
-                )
+        async def _send():
+            if request_type == "POST":
+                if not url:
+                    return await self.session.post(
+                        f"{self.API_URL}{method}",
+                        json=json_data,
+                        params=params,
+                        headers=headers,
+                    )
 
-            else:
-                response = await self.session.post(
+                return await self.session.post(
                     url, json=json_data, params=params, headers=headers
                 )
 
-        else:
             if not url:
-                response = await self.session.get(
+                return await self.session.get(
                     f"{self.API_URL}{method}", params=params, headers=headers
                 )
 
-            else:
-                response = await self.session.get(url, params=params, headers=headers)
+            return await self.session.get(url, params=params, headers=headers)
+
+        host = urlparse(url or self.API_URL).netloc
+        started = time.perf_counter()
+        status = "error"
+        with tracer.span(method or url, category="http"):
+            try:
+                if (
+                    configuration.hedge_api_requests
+                    and request_type == "GET"
+                    and not url
+                    and method in self.HEDGED_METHODS
+                ):
+                    response = await self.hedge_policy.run(method, _send)
+                else:
+                    response = await _send()
+
+                status = response.status_code
+
+            finally:
+                HTTP_REQUESTS.inc(host=host, method=method or url, status=status)
+                HTTP_LATENCY.observe(
+                    time.perf_counter() - started, host=host, method=method or url
+                )
+
+        if response.status_code == 401 and self.session_restored and not url:
+            # the cached token was revoked before its expiry
+            logger.debug("Account: {} | Cached session rejected, logging in again", self.account.auth_token)
+            state.drop_session(self.keypair.address)
+            self.session_restored = False
+            await self.login()
+            return await self.send_request(request_type, method, json_data, params, url, headers, verify)
 
         response.raise_for_status()
         if verify:
@@ -148,32 +205,35 @@ class MintChainAPI(Wallet):
         )
         return TaskListData(**response)
 
-    async def complete_tasks(self):
+    async def complete_tasks(self) -> bool:
+        completed = True
         task_list = await self.get_task_list()
         for task in task_list.result:
             if task.spec not in ("discord-follow", "stake"):
                 if task.claimed:
                     logger.debug(
-                        f"Account: {self.account.auth_token} | Task already completed: {task.name}"
+                        "Account: {} | Task already completed: {}",
+                        self.account.auth_token,
+                        task.name,
                     )
                     continue
 
                 try:
                     if task.spec in ("twitter-post", "twitter-follow"):
                         if not self.twitter_account:
-                            self.load_twitter_account()
+                            await self.load_twitter_account()
 
                         if task.spec == "twitter-follow":
-                            user_id = self.twitter_account.get_user_id(
+                            user_id = await self.twitter_account.get_user_id(
                                 "Mint_Blockchain"
                             )
-                            self.twitter_account.follow(user_id)
+                            await self.twitter_account.follow(user_id)
                             await self.submit_task_id(task.id)
 
                         else:
                             tweet_text = "I'm collecting @Mint_Blockchain's ME $MINT in the #MintForest🌳!\n\nMint is the L2 for NFT industry, powered by @nftscan_com and @Optimism.\n\nJoin Mint Forest here: https://mintchain.io/mint-forest\n\n#MintBlockchain #L2forNFT"
 
-                            data = self.twitter_account.tweet(tweet_text)
+                            data = await self.twitter_account.tweet(tweet_text)
                             tweet_url = f'https://x.com/JammerCrypto/status/{data["data"]["create_tweet"]["tweet_results"]["result"]["rest_id"]}'
                             await self.submit_task_id(task.id, twitter_post=tweet_url)
 
@@ -181,17 +241,29 @@ class MintChainAPI(Wallet):
                         await self.submit_task_id(task.id)
 
                     logger.debug(
-                        f"Account: {self.account.auth_token} | Task completed: {task.name} | Reward: {task.amount} energy"
+                        "Account: {} | Task completed: {} | Reward: {} energy",
+                        self.account.auth_token,
+                        task.name,
+                        task.amount,
                     )
                     await asyncio.sleep(3)
 
                 except APIError as error:
+                    completed = False
                     logger.error(
-                        f"Account: {self.account.auth_token} | Failed to complete task: {task.name} | {error}"
+                        "Account: {} | Failed to complete task: {} | {}",
+                        self.account.auth_token,
+                        task.name,
+                        error,
                     )
                     await asyncio.sleep(3)
 
+        return completed
+
     async def claim_daily_rewards(self) -> None:
+        forest_proofs = []
+        daily_claimed = False
+        daily_signin = False
         energy_list = await self.get_energy_list()
         for energy in energy_list.result:
             json_data = {
@@ -205,8 +277,10 @@ class MintChainAPI(Wallet):
             if energy.type == "daily":
                 if energy.freeze:
                     logger.debug(
-                        f"Account: {self.account.auth_token} | Daily reward already claimed"
+                        "Account: {} | Daily reward already claimed",
+                        self.account.auth_token,
                     )
+                    daily_claimed = True
                     continue
                 else:
                     json_data["freeze"] = energy.freeze
@@ -216,19 +290,35 @@ class MintChainAPI(Wallet):
             # ------------------------
 
             if await self.human_balance() > 0.00005:
+                if configuration.batch_forest_transactions:
+                    # recorded once the batched Signin transaction succeeded
+                    forest_proofs.append(await self.get_forest_proof('Signin'))
+                    daily_signin = daily_signin or energy.type == "daily"
+                    continue
+
                 status, tx_hash, amount = await self.get_forest_proof_and_send_transaction('Signin')
                 if status:
+                    daily_claimed = daily_claimed or energy.type == "daily"
                     logger.success(
-                        f"Account: {self.account.auth_token} | Claimed signin double daily reward | Amount: {amount} | Transaction: {tx_hash}"
+                        "Account: {} | Claimed signin double daily reward | Amount: {} | Transaction: {}",
+                        self.account.auth_token,
+                        amount,
+                        tx_hash,
                     )
             else:
                 logger.error(
-                    f"Account: {self.account.auth_token} | Insufficient balance to double signin transaction | Required: 0.00005 ETH"
+                    "Account: {} | Insufficient balance to double signin transaction | Required: 0.00005 ETH",
+                    self.account.auth_token,
                 )
 
                 await self.send_request(method="/tree/claim", json_data=json_data)
+                daily_claimed = daily_claimed or energy.type == "daily"
+                self.record_energy(energy.type, energy.amount)
                 logger.debug(
-                    f"Account: {self.account.auth_token} | Claimed {energy.amount} energy | Type: {energy.type}"
+                    "Account: {} | Claimed {} energy | Type: {}",
+                    self.account.auth_token,
+                    energy.amount,
+                    energy.type,
                 )
 
             # ------------------------
@@ -237,7 +327,13 @@ class MintChainAPI(Wallet):
 
             await asyncio.sleep(1)
 
-        await self.claim_boxes()
+        confirmed = await self.claim_boxes(forest_proofs)
+        if daily_signin and any(proof.type == "Signin" for proof in confirmed):
+            daily_claimed = True
+
+        if daily_claimed:
+            # the scheduler wakes the account again once the daily reward unfreezes
+            state.record(self.keypair.address, "daily_reward", True)
 
     async def bind_invite_code(self) -> ResponseData:
         jwt_token = self.jwt_token
@@ -261,12 +357,49 @@ class MintChainAPI(Wallet):
         )
         return ResponseData(**response.json())
 
-    async def load_twitter_account(self) -> None:
-        self.twitter_account = await TwitterAccountAsync.run(
-            auth_token=self.account.auth_token,
-            setup_session=True,
-            proxy=self.account.proxy,
+    async def restore_twitter_account(self) -> TwitterAccountAsync | None:
+        if self.account.auth_token in self.twitter_sessions:
+            return self.twitter_sessions[self.account.auth_token]
+
+        cookies = state.get_twitter_cookies(self.account.auth_token)
+        if not cookies:
+            return None
+
+        twitter_account = await TwitterAccountAsync.run(
+            cookies=cookies, setup_session=True, proxy=self.account.proxy
         )
+        twitter_account.session.headers.update(get_headers(twitter_account.session))
+        try:
+            await twitter_account.verify_credentials()
+        except TwitterError as error:
+            logger.debug(
+                "Account: {} | Cached Twitter session is invalid: {}", self.account.auth_token, error
+            )
+            state.drop_twitter_cookies(self.account.auth_token)
+            return None
+
+        return twitter_account
+
+    async def load_twitter_account(self) -> None:
+        twitter_account = None
+        if configuration.cache_sessions:
+            twitter_account = await self.restore_twitter_account()
+
+        if twitter_account is None:
+            twitter_account = await TwitterAccountAsync.run(
+                auth_token=self.account.auth_token,
+                setup_session=True,
+                proxy=self.account.proxy,
+            )
+            if configuration.cache_sessions:
+                state.save_twitter_cookies(
+                    self.account.auth_token, twitter_account.get_auth_data["cookies"]
+                )
+
+        if configuration.cache_sessions:
+            self.twitter_sessions[self.account.auth_token] = twitter_account
+
+        self.twitter_account = twitter_account
 
     async def connect_twitter(self) -> dict:
         params = {
@@ -318,22 +451,49 @@ class MintChainAPI(Wallet):
     # Start Upgrade from Mr. X
     # ------------------------
 
-    async def claim_boxes(self):
+    async def claim_boxes(self, forest_proofs: list[ForestProofData] = None) -> list[ForestProofData]:
+        """Opens the reward boxes, returns the batched proofs whose transaction succeeded"""
+        forest_proofs = forest_proofs or []
         assets = await self.assets()
-        for asset in assets:
-            if not asset.createdAt:
-                if await self.human_balance() > 0.00005:
-                    status, tx_hash, amount = await self.get_forest_proof_and_send_transaction('OpenReward', box_id = asset.id)
-                    if status:
-                        logger.success(
-                            f"Account: {self.account.auth_token} | Box opened reward | Amount: {amount} | Transaction: https://explorer.mintchain.io/tx/{tx_hash}"
-                        )
-                else:
+        box_ids = [asset.id for asset in assets if not asset.createdAt]
+        requests = [{"type": "OpenReward", "box_id": box_id} for box_id in box_ids]
+
+        insufficient_balance = False
+        async with ForestProofPrefetcher(
+            self, requests, window=configuration.forest_proof_prefetch
+        ) as proofs:
+            for _ in box_ids:
+                if insufficient_balance or await self.human_balance() <= 0.00005:
+                    # proofs of boxes that can't be opened are not requested
+                    insufficient_balance = True
+                    proofs.cancel()
                     logger.error(
                         f"Account: {self.account.auth_token} | Insufficient balance to openreward transaction | Required: 0.00005 ETH"
                     )
+                    continue
 
-            await asyncio.sleep(1)
+                try:
+                    proof = await anext(proofs)
+                    if configuration.batch_forest_transactions:
+                        forest_proofs.append(proof)
+                        continue
+
+                    status, tx_hash, amount = await self.send_forest_transaction(proof)
+
+                except Exception as error:
+                    raise Exception(f"Failed get forest proof and send transaction: {error}")
+
+                if status:
+                    logger.success(
+                        f"Account: {self.account.auth_token} | Box opened reward | Amount: {amount} | Transaction: https://explorer.mintchain.io/tx/{tx_hash}"
+                    )
+
+                await asyncio.sleep(1)
+
+        if forest_proofs:
+            return await self.process_forest_batch(forest_proofs)
+
+        return []
 
     # ------------------------
     # End Upgrade from Mr. X
@@ -352,6 +512,7 @@ class MintChainAPI(Wallet):
         }
 
         response = await self.send_request(method="/tree/inject", json_data=json_data)
+        self.record_energy("inject", amount)
         return InjectData(**response)
 
     async def fix_sign(self) -> None:
@@ -380,10 +541,9 @@ class MintChainAPI(Wallet):
             "user-agent": self.session.headers["user-agent"],
         }
 
+        url = "https://mn-ga.com/api/reward/nft-proof"
         async with httpx.AsyncClient(headers=headers) as client:
-            response = await client.get(
-                "https://mn-ga.com/api/reward/nft-proof", params=params
-            )
+            response = await circuits.call(url, lambda: client.get(url, params=params))
             response = response.json()
             return response["msg"]["proof"]
 
@@ -486,9 +646,7 @@ class MintChainAPI(Wallet):
             price = random.uniform(0.00001, 0.05)
             royalty_fee = random.randint(1, 50)
 
-            client = CreateXAPI(
-                mnemonic=self.account.pk_or_mnemonic, rpc_url=configuration.mint_rpc_url
-            )
+            client = CreateXAPI(self.account)
             await client.login()
             collection_id = await client.create_collection(
                 name=name,
@@ -527,6 +685,9 @@ class MintChainAPI(Wallet):
                 status, tx_hash = await self.send_and_verify_transaction(transaction)
                 return status, tx_hash
 
+            except CircuitOpenError as error:
+                raise Exception(f"Failed to mint GainFi NFT: {error}")
+
             except APIError as error:
                 if "Visit too frequently" in str(error):
                     logger.error(f"Account: {self.account.auth_token} | Visit too frequently | Retrying..")
@@ -567,7 +728,7 @@ class MintChainAPI(Wallet):
         return ResponseData(**response)
 
     async def join_airdrop(self) -> dict:
-        messages = self.sign_mint_message("airdrop")
+        messages = await self.sign_mint_message("airdrop")
 
         params = {
             "wallet_address": self.keypair.address,
@@ -590,57 +751,148 @@ class MintChainAPI(Wallet):
         response = await self.send_request(request_type="GET", method="/tree/total-user")
         return response['result']
     
+    async def get_forest_proof(
+        self, type: str, user_id: int = None, box_id: int = None
+    ) -> ForestProofData:
+        params = {
+            "type": type,
+        }
+
+        params_types = {
+            'Steal': {'id': user_id},
+            'OpenReward': {'boxId': box_id}
+        }
+
+        params.update(params_types.get(type, {}))
+
+        response = await self.send_request(method="/tree/get-forest-proof", request_type = "GET", params = params)
+
+        if type == 'Steal':
+            amount = response['result'].get('amount')
+        else:
+            amount = response['result'].get('energy')
+
+        return ForestProofData(type=type, tx=response['result']['tx'], amount=amount)
+
     async def get_forest_proof_and_send_transaction(self, type: str, user_id: int = None, box_id: int = None):
 
         try:
-            
-            params = {
-                "type": type,
-            }
+            proof = await self.get_forest_proof(type, user_id=user_id, box_id=box_id)
+            return await self.send_forest_transaction(proof)
 
-            params_types = {
-                'Steal': {'id': user_id},
-                'OpenReward': {'boxId': box_id}
-            }
-            
-            params.update(params_types.get(type, {}))
+        except Exception as error:
+            raise Exception(f"Failed get forest proof and send transaction: {error}")
 
-            response = await self.send_request(method="/tree/get-forest-proof", request_type = "GET", params = params)
-            data = response['result']['tx']
+    async def send_forest_transaction(
+        self, proof: ForestProofData
+    ) -> tuple[bool | Any, str, Any]:
+        if not proof.tx:
+            return False, "", proof.amount
 
-            if type == 'Steal':
-                amount = response['result'].get('amount')
-            else:
-                amount = response['result'].get('energy')
-
-            if data:
-
-                contract = "0x12906892AaA384ad59F2c431867af6632c68100a" # Mint Forest contact: https://explorer.mintchain.io/address/0x12906892AaA384ad59F2c431867af6632c68100a
-                transaction = {
-                    "from": self.keypair.address,
-                    "to": contract,
-                    "gasPrice": await self.eth.gas_price,
-                    "nonce": await self.transactions_count(),
-                    "gas": int(await self.eth.estimate_gas({
-                        "from": self.keypair.address,
-                        "to": contract,
-                        "data": data
-                    }) * 1.2),
-                    "data": data
-                }
+        transaction = await self.build_forest_transaction(proof.tx)
+        status, tx_hash = await self.send_and_verify_transaction(transaction)
+        if status:
+            self.record_energy(proof.type, proof.amount)
+
+        return status, tx_hash, proof.amount
+
+    @staticmethod
+    def record_energy(type: str, amount: Any) -> None:
+        try:
+            ENERGY.inc(float(amount), type="stolen" if type == "Steal" else type.lower())
+        except (TypeError, ValueError):
+            pass
+
+    async def send_forest_transactions(
+        self, proofs: list[ForestProofData]
+    ) -> list[tuple[bool | Any, str, Any]]:
+        # Forest proofs are bound to the sender, so they can't be routed through a multicall
+        # contract; instead nonces are reserved up front and all transactions are submitted back to back
+        proofs = [proof for proof in proofs if proof.tx]
+        if not proofs:
+            return []
+
+        try:
+            nonce = await self.transactions_count()
+            transactions = await asyncio.gather(
+                *[
+                    self.build_forest_transaction(proof.tx, nonce=nonce + index)
+                    for index, proof in enumerate(proofs)
+                ]
+            )
+
+            results = await self.send_and_verify_transactions(list(transactions))
+            for (status, _), proof in zip(results, proofs):
+                if status:
+                    self.record_energy(proof.type, proof.amount)
+
+            return [
+                (status, tx_hash, proof.amount)
+                for (status, tx_hash), proof in zip(results, proofs)
+            ]
 
-                status, tx_hash = await self.send_and_verify_transaction(transaction)
-                return status, tx_hash, amount
-            
         except Exception as error:
-            raise Exception(f"Failed get forest proof and send transaction: {error}")
-        
+            raise Exception(f"Failed to send batched forest transactions: {error}")
+
+    async def process_forest_batch(self, proofs: list[ForestProofData]) -> list[ForestProofData]:
+        """Sends the proofs back to back and returns the ones whose transaction succeeded"""
+        messages = {
+            "Signin": "Claimed signin double daily reward",
+            "OpenReward": "Box opened reward",
+            "Turntable": "Opened turntable",
+            "Steal": "Steal other trees user reward",
+        }
+
+        confirmed = []
+        results = await self.send_forest_transactions(proofs)
+        for proof, (status, tx_hash, amount) in zip(
+            [proof for proof in proofs if proof.tx], results
+        ):
+            if status:
+                confirmed.append(proof)
+                logger.success(
+                    f"Account: {self.account.auth_token} | {messages.get(proof.type, proof.type)} | Amount: {amount} | Transaction: https://explorer.mintchain.io/tx/{tx_hash}"
+                )
+            else:
+                logger.error(
+                    f"Account: {self.account.auth_token} | Failed forest transaction: {proof.type} | Transaction: https://explorer.mintchain.io/tx/{tx_hash}"
+                )
+
+        return confirmed
+
     # ------------------------
     # End Upgrade from Mr. X
     # ------------------------
 
+    def restore_session(self) -> bool:
+        if not configuration.cache_sessions:
+            return False
+
+        access_token = state.get_session(self.keypair.address)
+        if not access_token:
+            return False
+
+        self.session.headers["authorization"] = f"Bearer {access_token}"
+        self.session_restored = True
+        return True
+
+    def save_session(self, access_token: str) -> None:
+        if not configuration.cache_sessions:
+            return
+
+        try:
+            expires_at = self.token_expiry(access_token)
+        except (IndexError, KeyError, ValueError):
+            expires_at = time.time() + configuration.session_ttl * 3600
+
+        state.save_session(self.keypair.address, access_token, expires_at)
+
     async def login(self):
-        messages = self.sign_mint_message("forest")
+        if self.restore_session():
+            logger.debug("Account: {} | Reusing cached session", self.account.auth_token)
+            return
+
+        messages = await self.sign_mint_message("forest")
 
         json_data = {
             "address": self.keypair.address,
@@ -658,15 +910,17 @@ class MintChainAPI(Wallet):
         if not data.user.twitter:
             await self.connect_twitter()
             logger.debug(
-                f"Account: {self.account.auth_token} | Twitter account connected"
+                "Account: {} | Twitter account connected", self.account.auth_token
             )
 
         if not data.user.inviteId:
             await self.bind_invite_code()
-            logger.debug(f"Account: {self.account.auth_token} | Referral code bound")
+            logger.debug("Account: {} | Referral code bound", self.account.auth_token)
 
         await self.green_id()
         await self.assets()
         await self.rank_info()
         await self.user_info()
         await self.get_energy_list()
+        # cached only once onboarding went through, so a failed login is retried in full
+        self.save_session(data.access_token)
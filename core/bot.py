@@ -1,19 +1,63 @@
 import asyncio
 import random
+import time
 from typing import Any
 
 from models import Account
 from loguru import logger
-from loader import config
+from loader import config, state
 
 from .api import MintChainAPI
+from .prefetch import ForestProofPrefetcher
+from .metrics import ACCOUNTS, ACCOUNTS_IN_FLIGHT, STEPS, STEP_LATENCY
+from .tracing import tracer
 from .exceptions.base import APIError
 from .modules import CometBridge
 
 
 class Bot(MintChainAPI):
+    # modules that never have to run again for an account once they succeeded
+    ONE_TIME_MODULES = (
+        "tasks",
+        "fix_sign",
+        "mint_comm_nft",
+        "mint_make_nft_great_again",
+        "mint_summer_nft",
+        "mint_flag",
+        "mint_shop",
+        "mint_air3",
+        "mint_supermint",
+        "mint_owlto_summer_nft",
+        "mint_omnihub_summer_nft",
+        "mint_vip3_nft",
+        "mint_green_id",
+        "mint_gainfi_nft",
+    )
+
+    # modules that can be chained in config.pipeline
+    PIPELINE_MODULES = (
+        "rewards",
+        "only_rewards",
+        "fix_sign",
+        "tasks",
+        "comet_bridge",
+        "mint_random_all_nfts",
+        "mint_comm_nft",
+        "mint_make_nft_great_again",
+        "mint_summer_nft",
+        "mint_flag",
+        "mint_shop",
+        "mint_air3",
+        "mint_supermint",
+        "mint_owlto_summer_nft",
+        "mint_omnihub_summer_nft",
+        "mint_vip3_nft",
+        "mint_gainfi_nft",
+    )
+
     def __init__(self, account: Account):
         super().__init__(account_data=account)
+        self.logged_in = False
 
     async def safe_operation(
         self,
@@ -26,7 +70,11 @@ class Bot(MintChainAPI):
     ) -> bool:
         for _ in range(retries):
             try:
-                await operation() if argument is None else await operation(argument)
+                result = await operation() if argument is None else await operation(argument)
+                if result is False:
+                    logger.error(f"Account: {self.account.auth_token} | {error_message}")
+                    return False
+
                 logger.success(
                     f"Account: {self.account.auth_token} | {success_message}"
                 )
@@ -46,6 +94,21 @@ class Bot(MintChainAPI):
 
         return False
 
+    async def run_step(self, operation: callable) -> Any:
+        step = operation.__name__.removeprefix("process_")
+        started = time.perf_counter()
+        result = "error"
+        try:
+            with tracer.span(step, category="step"):
+                response = await operation()
+
+            result = "failed" if response is False else "success"
+            return response
+
+        finally:
+            STEPS.inc(step=step, result=result)
+            STEP_LATENCY.observe(time.perf_counter() - started, step=step)
+
     async def process_login(self) -> bool:
         logger.info(f"Account: {self.account.auth_token} | Logging in..")
         return await self.safe_operation(
@@ -107,14 +170,26 @@ class Bot(MintChainAPI):
                 if number_of_spins > 5:
                     number_of_spins = 5
 
-                for _ in range(number_of_spins):
-                    status, tx_hash, amount = await self.get_forest_proof_and_send_transaction('Turntable')
-
-                    if status:
-                        logger.success(
-                            f"Account: {self.account.auth_token} | Opened turntable | Reward: {amount} | Transaction: {tx_hash}"
-                        )
-                        await asyncio.sleep(3)
+                requests = [{"type": "Turntable"} for _ in range(number_of_spins)]
+                async with ForestProofPrefetcher(
+                    self, requests, window=config.forest_proof_prefetch
+                ) as proofs:
+                    if config.batch_forest_transactions:
+                        await self.process_forest_batch([proof async for proof in proofs])
+                        return True
+
+                    for _ in requests:
+                        try:
+                            proof = await anext(proofs)
+                            status, tx_hash, amount = await self.send_forest_transaction(proof)
+                        except Exception as error:
+                            raise Exception(f"Failed get forest proof and send transaction: {error}")
+
+                        if status:
+                            logger.success(
+                                f"Account: {self.account.auth_token} | Opened turntable | Reward: {amount} | Transaction: {tx_hash}"
+                            )
+                            await asyncio.sleep(3)
 
             except Exception as error:
                 logger.error(
@@ -139,7 +214,7 @@ class Bot(MintChainAPI):
                 f"Account: {self.account.auth_token} | Failed to get user info: {error} | Daily actions done.."
             )
 
-    async def process_mint_comm_nft(self) -> None:
+    async def process_mint_comm_nft(self) -> bool:
         try:
             await self.check_balance()
 
@@ -164,10 +239,13 @@ class Bot(MintChainAPI):
                     f"Account: {self.account.auth_token} | Failed to mint commemorative NFT | Transaction: https://explorer.mintchain.io/tx/{transaction_hash}"
                 )
 
+            return status
+
         except Exception as error:
             logger.error(f"Account: {self.account.auth_token} | {error}")
+            return False
 
-    async def process_mint_make_nft_great_again(self) -> None:
+    async def process_mint_make_nft_great_again(self) -> bool:
         try:
             await self.check_balance()
             logger.info(f"Account: {self.account.auth_token} | Minting MNGA NFT..")
@@ -182,10 +260,13 @@ class Bot(MintChainAPI):
                     f"Account: {self.account.auth_token} | Failed to mint MNGA NFT | Transaction: https://explorer.mintchain.io/tx/{transaction_hash}"
                 )
 
+            return status
+
         except Exception as error:
             logger.error(f"Account: {self.account.auth_token} | {error}")
+            return False
 
-    async def process_mint_flag_nft(self) -> None:
+    async def process_mint_flag_nft(self) -> bool:
         try:
             await self.check_balance()
             logger.info(f"Account: {self.account.auth_token} | Minting Flag NFT..")
@@ -200,10 +281,13 @@ class Bot(MintChainAPI):
                     f"Account: {self.account.auth_token} | Failed to mint Flag NFT | Transaction: https://explorer.mintchain.io/tx/{transaction_hash}"
                 )
 
+            return status
+
         except Exception as error:
             logger.error(f"Account: {self.account.auth_token} | {error}")
+            return False
 
-    async def process_mint_supermint_nft(self) -> None:
+    async def process_mint_supermint_nft(self) -> bool:
         try:
             await self.check_balance()
             logger.info(f"Account: {self.account.auth_token} | Minting SuperMint NFT..")
@@ -218,10 +302,13 @@ class Bot(MintChainAPI):
                     f"Account: {self.account.auth_token} | Failed to mint SuperMint NFT | Transaction: https://explorer.mintchain.io/tx/{transaction_hash}"
                 )
 
+            return status
+
         except Exception as error:
             logger.error(f"Account: {self.account.auth_token} | {error}")
+            return False
 
-    async def process_mint_air3_nft(self) -> None:
+    async def process_mint_air3_nft(self) -> bool:
         try:
             await self.check_balance()
             logger.info(f"Account: {self.account.auth_token} | Minting Air3 NFT..")
@@ -236,10 +323,13 @@ class Bot(MintChainAPI):
                     f"Account: {self.account.auth_token} | Failed to mint Air3 NFT | Transaction: https://explorer.mintchain.io/tx/{transaction_hash}"
                 )
 
+            return status
+
         except Exception as error:
             logger.error(f"Account: {self.account.auth_token} | {error}")
+            return False
 
-    async def process_mint_shop_nft(self) -> None:
+    async def process_mint_shop_nft(self) -> bool:
         try:
             await self.check_balance()
             logger.info(f"Account: {self.account.auth_token} | Minting Shop NFT..")
@@ -254,8 +344,11 @@ class Bot(MintChainAPI):
                     f"Account: {self.account.auth_token} | Failed to mint Shop NFT | Transaction: https://explorer.mintchain.io/tx/{transaction_hash}"
                 )
 
+            return status
+
         except Exception as error:
             logger.error(f"Account: {self.account.auth_token} | {error}")
+            return False
 
     async def process_join_airdrop(self) -> None:
         try:
@@ -272,7 +365,7 @@ class Bot(MintChainAPI):
                 f"Account: {self.account.auth_token} | Failed to join airdrop: {error}"
             )
 
-    async def process_mint_vip3_nft(self) -> None:
+    async def process_mint_vip3_nft(self) -> bool:
         try:
             await self.check_balance()
 
@@ -295,17 +388,20 @@ class Bot(MintChainAPI):
                     f"Account: {self.account.auth_token} | Failed to mint VIP3 NFT | Transaction: https://explorer.mintchain.io/tx/{transaction_hash}"
                 )
 
+            return status
+
         except Exception as error:
             logger.error(f"Account: {self.account.auth_token} | {error}")
+            return False
 
-    async def process_mint_green_id(self) -> None:
+    async def process_mint_green_id(self) -> bool:
         try:
             await self.check_balance()
             logger.info(f"Account: {self.account.auth_token} | Minting Green ID..")
 
             tree_id = await self.process_get_tree_id()
             if not tree_id:
-                return
+                return False
 
             status, transaction_hash = await self.mint_green_id_nft(int(tree_id))
 
@@ -318,11 +414,14 @@ class Bot(MintChainAPI):
                     f"Account: {self.account.auth_token} | Failed to mint Green ID | Transaction: https://explorer.mintchain.io/tx/{transaction_hash}"
                 )
 
+            return status
+
         except Exception as error:
             logger.error(f"Account: {self.account.auth_token} | {error}")
+            return False
 
 
-    async def process_mint_gainfi_nft(self) -> None:
+    async def process_mint_gainfi_nft(self) -> bool:
         try:
             await self.check_balance()
             logger.info(f"Account: {self.account.auth_token} | Minting GainFi NFT..")
@@ -337,8 +436,11 @@ class Bot(MintChainAPI):
                     f"Account: {self.account.auth_token} | Failed to mint GainFi NFT | Transaction: https://explorer.mintchain.io/tx/{transaction_hash}"
                 )
 
+            return status
+
         except Exception as error:
             logger.error(f"Account: {self.account.auth_token} | {error}")
+            return False
 
     # async def process_mint_omnihub_collection(self) -> None:
     #     try:
@@ -362,7 +464,7 @@ class Bot(MintChainAPI):
     #             f"Account: {self.account.auth_token} | {error}"
     #         )
 
-    async def process_mint_summer_nft(self) -> None:
+    async def process_mint_summer_nft(self) -> bool:
         try:
             if await self.human_balance() < 0.0001:
                 raise Exception(
@@ -381,10 +483,13 @@ class Bot(MintChainAPI):
                     f"Account: {self.account.auth_token} | Failed to mint Summer NFT | Transaction: https://explorer.mintchain.io/tx/{transaction_hash}"
                 )
 
+            return status
+
         except Exception as error:
             logger.error(f"Account: {self.account.auth_token} | {error}")
+            return False
 
-    async def process_mint_owlto_summer_fest_nft(self) -> None:
+    async def process_mint_owlto_summer_fest_nft(self) -> bool:
         try:
             if await self.human_balance() < 0.0001:
                 raise Exception(
@@ -405,10 +510,13 @@ class Bot(MintChainAPI):
                     f"Account: {self.account.auth_token} | Failed to mint Owlto Summer Fest NFT | Transaction: https://explorer.mintchain.io/tx/{transaction_hash}"
                 )
 
+            return status
+
         except Exception as error:
             logger.error(f"Account: {self.account.auth_token} | {error}")
+            return False
 
-    async def process_mint_omnihub_summer_nft(self) -> None:
+    async def process_mint_omnihub_summer_nft(self) -> bool:
         try:
             if await self.human_balance() < 0.0001:
                 raise Exception(
@@ -429,10 +537,13 @@ class Bot(MintChainAPI):
                     f"Account: {self.account.auth_token} | Failed to mint OmniHub Summer NFT | Transaction: https://explorer.mintchain.io/tx/{transaction_hash}"
                 )
 
+            return status
+
         except Exception as error:
             logger.error(f"Account: {self.account.auth_token} | {error}")
+            return False
 
-    async def process_comet_bridge(self) -> None:
+    async def process_comet_bridge(self) -> bool:
         try:
             amount_to_bridge = random.uniform(
                 config.comet_bridge_amount_min, config.comet_bridge_amount_max
@@ -460,10 +571,13 @@ class Bot(MintChainAPI):
                     f"Account: {self.account.auth_token} | Failed to bridge {amount_to_bridge} ETH to MINT | Transaction: https://arbiscan.io/tx/{tx_hash}"
                 )
 
+            return status
+
         except Exception as error:
             logger.error(
                 f"Account: {self.account.auth_token} | Error while bridging: {error}"
             )
+            return False
 
     async def process_complete_tasks(self):
         return await self.safe_operation(
@@ -494,7 +608,7 @@ class Bot(MintChainAPI):
         )
         return False
 
-    async def process_mint_random_all_nfts(self) -> None:
+    async def process_mint_random_all_nfts(self) -> bool:
         operations_dict = {
             "mint_comm_nft": self.process_mint_comm_nft,
             "mint_make_nft_great_again": self.process_mint_make_nft_great_again,
@@ -512,24 +626,43 @@ class Bot(MintChainAPI):
         mint_modules = config.mint_random_all_nfts
         random.shuffle(mint_modules)
 
+        completed = True
         for module in mint_modules:
             operation = operations_dict.get(module)
             if operation:
+                if config.skip_completed and state.is_completed(self.keypair.address, module):
+                    logger.info(
+                        "Account: {} | {} already completed | Skipping..",
+                        self.account.auth_token,
+                        module,
+                    )
+                    continue
+
                 try:
-                    await operation()
+                    minted = bool(await self.run_step(operation))
+                    completed = completed and minted
+                    state.record(self.keypair.address, module, minted)
                 except Exception as error:
+                    completed = False
                     logger.error(
-                        f"Account: {self.account.auth_token} | Failed to process {module}: {error}"
+                        "Account: {} | Failed to process {}: {}",
+                        self.account.auth_token,
+                        module,
+                        error,
                     )
                 finally:
                     delay = random.randint(
                         config.delay_between_mint_min, config.delay_between_mint_max
                     )
                     logger.debug(
-                        f"Account: {self.account.auth_token} | Sleeping for {delay} seconds.."
+                        "Account: {} | Sleeping for {} seconds..",
+                        self.account.auth_token,
+                        delay,
                     )
                     await asyncio.sleep(delay)
 
+        return completed
+
     # ------------------------
     # Start Upgrade from Mr. X
     # ------------------------
@@ -553,7 +686,7 @@ class Bot(MintChainAPI):
             )
             await asyncio.sleep(1)
 
-    async def process_find_and_steal_rewards(self, start: int, end: int, min_amount: int = None):
+    async def process_find_and_steal_rewards(self, start: int, end: int, min_amount: int = None) -> bool:
         try:
 
             if not await self.process_login():
@@ -563,7 +696,10 @@ class Bot(MintChainAPI):
                 min_amount = 0
             
             logger.debug(
-                f"Account: {self.account.auth_token} | Begin the search for energy on trees in the range | Range: {start}, {end}"
+                "Account: {} | Begin the search for energy on trees in the range | Range: {}, {}",
+                self.account.auth_token,
+                start,
+                end,
             )
 
 
@@ -584,42 +720,50 @@ class Bot(MintChainAPI):
                             if energy.stealable and energy.amount >= min_amount:
 
                                 logger.debug(
-                                    f"Account: {self.account.auth_token} | Find other trees user reward | Tree: {tree_id} | Amount: {energy.amount}"
+                                    "Account: {} | Find other trees user reward | Tree: {} | Amount: {}",
+                                    self.account.auth_token,
+                                    tree_id,
+                                    energy.amount,
                                 )
 
                                 status, tx_hash, amount = await self.get_forest_proof_and_send_transaction('Steal', user_id = other_user_info.id)
                                 if status:
                                     logger.success(
-                                        f"Account: {self.account.auth_token} | Steal other trees user reward | Tree: {tree_id} | Amount: {amount} | Transaction: https://explorer.mintchain.io/tx/{tx_hash}"
+                                        "Account: {} | Steal other trees user reward | Tree: {} | Amount: {} | Transaction: https://explorer.mintchain.io/tx/{}",
+                                        self.account.auth_token,
+                                        tree_id,
+                                        amount,
+                                        tx_hash,
                                     )
 
                 await asyncio.sleep(0.5)
 
+            return True
+
         except Exception as error:
 
             if "Invalid User" in str(error) or "No Data" in str(error):
                 logger.warning(
-                    f"Account: {self.account.auth_token} | Warning Invalid User or No data: {error}"
+                    "Account: {} | Warning Invalid User or No data: {}",
+                    self.account.auth_token,
+                    error,
                 )
             else:
                 logger.error(
-                    f"Account: {self.account.auth_token} | Failed to find other trees rewards: {error}"
+                    "Account: {} | Failed to find other trees rewards: {}",
+                    self.account.auth_token,
+                    error,
                 )
                 await asyncio.sleep(1)
 
+            return False
+
     # ------------------------
     # End Upgrade from Mr. X
     # ------------------------ 
 
-    async def start(self):
-        random_delay = random.randint(
-            config.min_delay_before_start, config.max_delay_before_start
-        )
-        logger.info(
-            f"Account: {self.account.auth_token} | Work will start in {random_delay} seconds.."
-        )
-        await asyncio.sleep(random_delay)
-
+    def operations(self, module: str) -> list[callable] | None:
+        """Steps of `module`, None if the module has no steps of its own"""
         operations_dict = {
             "rewards": [
                 self.process_login,
@@ -646,21 +790,76 @@ class Bot(MintChainAPI):
             "mint_owlto_summer_nft": [self.process_mint_owlto_summer_fest_nft],
             "mint_omnihub_summer_nft": [self.process_mint_omnihub_summer_nft],
             "mint_vip3_nft": [self.process_mint_vip3_nft],
+            "mint_green_id": [self.process_mint_green_id],
             "tasks": [self.process_login, self.process_complete_tasks],
             "mint_gainfi_nft": [self.process_mint_gainfi_nft],
             "default": [self.process_login, self.process_complete_tasks],
         }
 
-        operations = operations_dict.get(config.module, operations_dict["default"])
+        return operations_dict.get(module)
+
+    async def run_module(self, module: str) -> str:
+        for operation in self.operations(module) or self.operations("default"):
+            # one login serves every module of a pipeline
+            if operation == self.process_login and self.logged_in:
+                continue
+
+            response = await self.run_step(operation)
+            if operation == self.process_login:
+                self.logged_in = bool(response)
 
+            # steps without a result (None) only report, any other falsy result stops the module
+            if not response and response is not None:
+                return "failed"
+
+        return "success"
+
+    async def start(self) -> str:
+        tracer.set_account(self.account.auth_token)
+        random_delay = random.randint(
+            config.min_delay_before_start, config.max_delay_before_start
+        )
+        logger.info(
+            f"Account: {self.account.auth_token} | Work will start in {random_delay} seconds.."
+        )
+        with tracer.span("start_delay"):
+            await asyncio.sleep(random_delay)
+
+        modules = config.pipeline if config.module == "pipeline" else [config.module]
+
+        ACCOUNTS_IN_FLIGHT.inc()
+        results = []
         try:
-            for operation in operations:
-                if not await operation():
-                    break
+            for module in modules:
+                if (
+                    len(modules) > 1
+                    and config.skip_completed
+                    and module in self.ONE_TIME_MODULES
+                    and state.is_completed(self.keypair.address, module)
+                ):
+                    logger.info(
+                        f"Account: {self.account.auth_token} | {module} already completed | Skipping.."
+                    )
+                    continue
+
+                result = "failed"
+                try:
+                    with tracer.span(module, category="module"):
+                        result = await self.run_module(module)
+                except Exception as error:
+                    logger.error(
+                        f"Account: {self.account.auth_token} | Unhandled error in {module}: {error}"
+                    )
+                finally:
+                    results.append(result)
+                    # modules falling back to the default steps didn't do their own work
+                    if self.operations(module) is not None:
+                        state.record(self.keypair.address, module, result == "success")
 
-        except Exception as error:
-            logger.error(
-                f"Account: {self.account.auth_token} | Unhandled error: {error}"
-            )
         finally:
+            account_result = "success" if all(result == "success" for result in results) else "failed"
+            ACCOUNTS_IN_FLIGHT.dec()
+            ACCOUNTS.inc(result=account_result)
             logger.success(f"Account: {self.account.auth_token} | Finished")
+
+        return account_result
@@ -0,0 +1,117 @@
+import asyncio
+import math
+import time
+from typing import Any, Awaitable, Callable
+from urllib.parse import urlparse
+
+from loguru import logger
+
+from loader import config
+from .exceptions.base import CircuitOpenError
+from .metrics import CIRCUIT_OPEN, CIRCUIT_REJECTED
+
+
+class CircuitBreaker:
+    """
+    Rejects requests to a host right away once `failure_threshold` requests in a row failed.
+    After `recovery_timeout` seconds a single request is let through as a probe: a success closes
+    the circuit, a failure keeps it open for another `recovery_timeout` seconds.
+    Connection errors, timeouts and 5xx responses count as failures.
+    """
+
+    def __init__(self, host: str, failure_threshold: int = 5, recovery_timeout: float = 60):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+
+        return "half_open" if self._probing else "open"
+
+    def before_request(self) -> None:
+        if self.opened_at is None:
+            return
+
+        retry_in = self.opened_at + self.recovery_timeout - time.monotonic()
+        if self._probing or retry_in > 0:
+            CIRCUIT_REJECTED.inc(host=self.host)
+            raise CircuitOpenError(f"{self.host} is unavailable | Next check in {max(math.ceil(retry_in), 0)}s")
+
+        self._probing = True
+
+    def record_success(self) -> None:
+        if self.opened_at is not None:
+            logger.info(f"Host: {self.host} | Recovered | Circuit closed")
+            CIRCUIT_OPEN.set(0, host=self.host)
+
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._probing:
+            self.opened_at = time.monotonic()
+            self._probing = False
+
+        elif self.opened_at is None and self.failures >= self.failure_threshold:
+            logger.warning(
+                f"Host: {self.host} | {self.failures} failed requests in a row | "
+                f"Circuit opened for {self.recovery_timeout:g}s"
+            )
+            self.opened_at = time.monotonic()
+            CIRCUIT_OPEN.set(1, host=self.host)
+
+    async def call(self, request: Callable[[], Awaitable[Any]]) -> Any:
+        self.before_request()
+        try:
+            response = await request()
+        except asyncio.CancelledError:
+            # let another request probe the host
+            self._probing = False
+            raise
+        except Exception:
+            self.record_failure()
+            raise
+
+        status = getattr(response, "status_code", None)
+        if status is not None and status >= 500:
+            self.record_failure()
+        else:
+            self.record_success()
+
+        return response
+
+
+class CircuitBreakers:
+    """Circuit breakers of external hosts, shared by all accounts of the process"""
+
+    def __init__(self):
+        self.breakers: dict[str, CircuitBreaker] = {}
+
+    def get(self, url: str) -> CircuitBreaker:
+        host = urlparse(url).netloc or url
+        if host not in self.breakers:
+            self.breakers[host] = CircuitBreaker(
+                host,
+                failure_threshold=config.circuit_breaker_failures,
+                recovery_timeout=config.circuit_breaker_timeout,
+            )
+
+        return self.breakers[host]
+
+    async def call(self, url: str, request: Callable[[], Awaitable[Any]]) -> Any:
+        if not config.circuit_breaker_failures:
+            return await request()
+
+        return await self.get(url).call(request)
+
+
+circuits = CircuitBreakers()
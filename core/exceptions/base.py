@@ -8,3 +8,9 @@ class StealEnergyError(APIError):
     """Raised when failed to steal energy"""
 
     pass
+
+
+class CircuitOpenError(APIError):
+    """Raised when a request is rejected because its host is considered down"""
+
+    pass
@@ -0,0 +1,129 @@
+import asyncio
+import time
+from collections import defaultdict, deque
+from typing import Any, Awaitable, Callable
+
+from .metrics import HEDGE_WINS, HEDGED_REQUESTS
+
+
+class LatencyWindow:
+    """Rolling window of request latencies (seconds)"""
+
+    def __init__(self, size: int = 200):
+        self.samples: deque[float] = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    def add(self, latency: float) -> None:
+        self.samples.append(latency)
+
+    def percentile(self, percent: float) -> float | None:
+        if not self.samples:
+            return None
+
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(len(ordered) * percent / 100))
+        return ordered[index]
+
+    @property
+    def average(self) -> float | None:
+        if not self.samples:
+            return None
+
+        return sum(self.samples) / len(self.samples)
+
+
+async def hedged(
+    primary: Callable[[], Awaitable[Any]],
+    secondary: Callable[[], Awaitable[Any]],
+    delay: float,
+) -> tuple[Any, bool, bool]:
+    """
+    Starts `primary`, and if it hasn't finished after `delay` seconds starts `secondary` too.
+    Returns the first successful result, whether the hedge was fired and whether the hedge won.
+    """
+    first = asyncio.ensure_future(primary())
+    pending = {first}
+    fired = False
+    error = None
+
+    try:
+        done, _ = await asyncio.wait(pending, timeout=delay)
+        if not done:
+            pending.add(asyncio.ensure_future(secondary()))
+            fired = True
+
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                if task.exception() is None:
+                    return task.result(), fired, task is not first
+
+                error = task.exception()
+
+        raise error
+
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+class HedgePolicy:
+    """Hedges requests after a percentile-derived delay and keeps hedge-rate statistics per key"""
+
+    def __init__(self, percentile: float = 95, min_samples: int = 20, min_delay: float = 0.05):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+
+        self.latencies: dict[str, LatencyWindow] = defaultdict(LatencyWindow)
+        self.requests: dict[str, int] = defaultdict(int)
+        self.hedged: dict[str, int] = defaultdict(int)
+        self.hedge_wins: dict[str, int] = defaultdict(int)
+
+    def delay(self, key: str) -> float | None:
+        window = self.latencies[key]
+        if len(window) < self.min_samples:
+            return None
+
+        return max(window.percentile(self.percentile), self.min_delay)
+
+    async def run(self, key: str, request: Callable[[], Awaitable[Any]]) -> Any:
+        async def attempt() -> Any:
+            started = time.perf_counter()
+            try:
+                result = await request()
+            except asyncio.CancelledError:
+                # the attempt lost the race, its elapsed time is a lower bound of its latency
+                self.latencies[key].add(time.perf_counter() - started)
+                raise
+
+            self.latencies[key].add(time.perf_counter() - started)
+            return result
+
+        self.requests[key] += 1
+        delay = self.delay(key)
+        if delay is None:
+            return await attempt()
+
+        result, fired, won = await hedged(attempt, attempt, delay)
+        if fired:
+            self.hedged[key] += 1
+            HEDGED_REQUESTS.inc(method=key)
+        if won:
+            self.hedge_wins[key] += 1
+            HEDGE_WINS.inc(method=key)
+
+        return result
+
+    def summary(self) -> str:
+        requests = sum(self.requests.values())
+        hedged_requests = sum(self.hedged.values())
+        rate = hedged_requests / requests * 100 if requests else 0
+        return (
+            f"Hedged requests: {hedged_requests}/{requests} ({rate:.1f}%) | "
+            f"Hedge wins: {sum(self.hedge_wins.values())}"
+        )
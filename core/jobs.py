@@ -0,0 +1,273 @@
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import time
+from typing import Awaitable, Callable
+
+from loguru import logger
+
+from models import Account, proxy_url
+from loader import config
+from .keystore import KeyStore
+from .metrics import metrics
+
+
+class JobQueue:
+    """
+    Account jobs shared by a coordinator and any number of worker processes through a SQLite file.
+    Uses the rollback journal instead of WAL, so the file can also live on a network share with working locks.
+    Jobs only reference accounts by the fingerprint of their key, workers look the accounts up in their own accounts.txt.
+    """
+
+    def __init__(self, path: str, timeout: float = 30):
+        self.path = path
+        self.timeout = timeout
+        self._connection: sqlite3.Connection | None = None
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            self._connection.row_factory = sqlite3.Row
+            self._drop_plaintext_jobs()
+            self._connection.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS runs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    module TEXT NOT NULL,
+                    pipeline TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    run_id INTEGER NOT NULL,
+                    account TEXT NOT NULL,
+                    proxy TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    worker TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    updated_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS jobs_status ON jobs (run_id, status);
+                CREATE TABLE IF NOT EXISTS workers (
+                    name TEXT NOT NULL,
+                    run_id INTEGER NOT NULL,
+                    heartbeat REAL NOT NULL,
+                    metrics TEXT NOT NULL,
+                    PRIMARY KEY (name, run_id)
+                );
+                """
+            )
+
+        return self._connection
+
+    def _drop_plaintext_jobs(self) -> None:
+        # queues of older versions stored the private keys and mnemonics themselves
+        columns = [row["name"] for row in self._connection.execute("PRAGMA table_info(jobs)")]
+        if "pk_or_mnemonic" in columns:
+            logger.warning(f"Dropping the jobs of <<{self.path}>> | They were stored with plaintext account keys")
+            self._connection.execute("DROP TABLE jobs")
+
+    def publish(self, module: str, pipeline: list[str], accounts: list[Account]) -> int:
+        now = time.time()
+        with self.connection:
+            self.connection.execute("BEGIN IMMEDIATE")
+            run_id = self.connection.execute(
+                "INSERT INTO runs (module, pipeline, created_at) VALUES (?, ?, ?)",
+                (module, json.dumps(pipeline), now),
+            ).lastrowid
+            self.connection.executemany(
+                "INSERT INTO jobs (run_id, account, proxy, updated_at) VALUES (?, ?, ?, ?)",
+                [
+                    (run_id, KeyStore.fingerprint(account.pk_or_mnemonic), account.proxy or "", now)
+                    for account in accounts
+                ],
+            )
+
+        return run_id
+
+    def get_run(self, run_id: int) -> sqlite3.Row:
+        return self.connection.execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+
+    def claim(self, worker: str, run_id: int = None) -> sqlite3.Row | None:
+        """Marks the oldest pending job (of `run_id` if given) as taken by `worker` and returns it"""
+        query = "SELECT id FROM jobs WHERE status = 'pending'"
+        params = ()
+        if run_id is not None:
+            query += " AND run_id = ?"
+            params = (run_id,)
+
+        with self.connection:
+            self.connection.execute("BEGIN IMMEDIATE")
+            row = self.connection.execute(f"{query} ORDER BY id LIMIT 1", params).fetchone()
+            if row is None:
+                return None
+
+            return self.connection.execute(
+                """
+                UPDATE jobs SET status = 'running', worker = ?, attempts = attempts + 1, updated_at = ?
+                WHERE id = ? RETURNING *
+                """,
+                (worker, time.time(), row["id"]),
+            ).fetchone()
+
+    def finish(self, job_id: int, status: str) -> None:
+        with self.connection:
+            self.connection.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE id = ?", (status, time.time(), job_id)
+            )
+
+    def heartbeat(self, worker: str, run_id: int, snapshot: dict) -> None:
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO workers (name, run_id, heartbeat, metrics) VALUES (?, ?, ?, ?)",
+                (worker, run_id, time.time(), json.dumps(snapshot)),
+            )
+
+    def requeue_stale(self, run_id: int, timeout: float, max_attempts: int = 3) -> int:
+        """Returns running jobs of workers that stopped sending heartbeats to the queue"""
+        deadline = time.time() - timeout
+        with self.connection:
+            self.connection.execute("BEGIN IMMEDIATE")
+            stale_workers = """
+                SELECT name FROM workers WHERE run_id = ?
+                GROUP BY name HAVING MAX(heartbeat) < ?
+            """
+            self.connection.execute(
+                f"""
+                UPDATE jobs SET status = 'failed', updated_at = ?
+                WHERE run_id = ? AND status = 'running' AND attempts >= ? AND worker IN ({stale_workers})
+                """,
+                (time.time(), run_id, max_attempts, run_id, deadline),
+            )
+            return self.connection.execute(
+                f"""
+                UPDATE jobs SET status = 'pending', worker = NULL, updated_at = ?
+                WHERE run_id = ? AND status = 'running' AND worker IN ({stale_workers})
+                """,
+                (time.time(), run_id, run_id, deadline),
+            ).rowcount
+
+    def progress(self, run_id: int) -> dict[str, int]:
+        rows = self.connection.execute(
+            "SELECT status, COUNT(*) AS count FROM jobs WHERE run_id = ? GROUP BY status", (run_id,)
+        )
+        return {row["status"]: row["count"] for row in rows}
+
+    def worker_metrics(self, run_id: int) -> list[dict]:
+        rows = self.connection.execute("SELECT metrics FROM workers WHERE run_id = ?", (run_id,))
+        return [json.loads(row["metrics"]) for row in rows]
+
+    def workers(self, run_id: int, timeout: float) -> int:
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM workers WHERE run_id = ? AND heartbeat >= ?", (run_id, time.time() - timeout)
+        ).fetchone()[0]
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+class Worker:
+    """
+    Takes account jobs from the queue and runs them with `run_account`, at most `config.threads` at a time.
+    Jobs of one run are finished before the next run is started, since the module is a global setting.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        run_account: Callable[[Account], Awaitable[str]],
+        accounts: list[Account],
+        name: str = None,
+        proxies: list[str] = None,
+        poll_interval: float = 2,
+        heartbeat_interval: float = 5,
+    ):
+        self.queue = queue
+        self.run_account = run_account
+        self.accounts = {KeyStore.fingerprint(account.pk_or_mnemonic): account for account in accounts}
+        self.name = name or f"{socket.gethostname()}-{os.getpid()}"
+        self.proxies = proxies or []
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+
+        self.run_id: int | None = None
+        self._running: set[asyncio.Task] = set()
+        self._jobs = 0
+
+    def account(self, job: sqlite3.Row) -> Account | None:
+        account = self.accounts.get(job["account"])
+        if account is None:
+            return None
+
+        if self.proxies:
+            return account.model_copy(update={"proxy": proxy_url(self.proxies[self._jobs % len(self.proxies)])})
+
+        # the coordinator may have moved the account to another proxy after checking them
+        return account.model_copy(update={"proxy": job["proxy"] or None})
+
+    def start_run(self, run_id: int) -> None:
+        run = self.queue.get_run(run_id)
+        config.module = run["module"]
+        config.pipeline = json.loads(run["pipeline"])
+        # workers report the metrics of the current run only
+        metrics.reset()
+        self.run_id = run_id
+        self.queue.heartbeat(self.name, run_id, metrics.snapshot())
+        logger.info(f"Worker: {self.name} | Started run {run_id} | Module: {config.module}")
+
+    async def _run_job(self, job: sqlite3.Row, account: Account) -> None:
+        status = "failed"
+        try:
+            status = "done" if await self.run_account(account) == "success" else "failed"
+        except Exception as error:
+            logger.error(f"Account: {account.auth_token} | Job failed: {error}")
+        finally:
+            self.queue.finish(job["id"], status)
+            self.queue.heartbeat(self.name, job["run_id"], metrics.snapshot())
+
+    async def _heartbeat(self) -> None:
+        while True:
+            if self.run_id is not None:
+                self.queue.heartbeat(self.name, self.run_id, metrics.snapshot())
+
+            await asyncio.sleep(self.heartbeat_interval)
+
+    async def run(self) -> None:
+        logger.info(f"Worker: {self.name} | Waiting for jobs in {self.queue.path}")
+        heartbeat = asyncio.create_task(self._heartbeat())
+        try:
+            while True:
+                if len(self._running) >= config.threads:
+                    await asyncio.sleep(0.1)
+                    continue
+
+                job = self.queue.claim(self.name, self.run_id) if self.run_id is not None else None
+                if job is None and not self._running:
+                    job = self.queue.claim(self.name)
+
+                if job is not None and job["run_id"] != self.run_id:
+                    # jobs of another run are only claimed once the running ones are finished
+                    self.start_run(job["run_id"])
+
+                if job is None:
+                    await asyncio.sleep(self.poll_interval if not self._running else 0.5)
+                    continue
+
+                account = self.account(job)
+                if account is None:
+                    logger.error(f"Worker: {self.name} | Job {job['id']} | Account is missing in accounts.txt")
+                    self.queue.finish(job["id"], "failed")
+                    continue
+
+                self._jobs += 1
+                task = asyncio.create_task(self._run_job(job, account))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+
+        finally:
+            heartbeat.cancel()
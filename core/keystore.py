@@ -0,0 +1,159 @@
+import hashlib
+import json
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from Crypto.Cipher import AES
+from eth_account import Account
+from eth_account.signers.local import LocalAccount
+from loguru import logger
+
+Account.enable_unaudited_hdwallet_features()
+
+
+def derive_private_key(secret: str) -> bytes:
+    secret = secret.strip()
+    if len(secret.split()) in (12, 24):
+        return bytes(Account.from_mnemonic(secret).key)
+
+    return bytes(Account.from_key(secret).key)
+
+
+class KeyStore:
+    """Per-process cache of derived keypairs, optionally persisted encrypted on disk"""
+
+    KDF_ITERATIONS = 200_000
+
+    def __init__(self, path: str, password: str = ""):
+        self.path = path
+        self.password = password
+
+        self._keypairs: dict[str, LocalAccount] = {}
+        self._encrypted: dict[str, dict] = {}
+        self._salt: bytes = b""
+        self._cipher_key: bytes = b""
+        self._dirty = False
+
+        if self.password:
+            self.load()
+
+    @staticmethod
+    def fingerprint(secret: str) -> str:
+        return hashlib.sha256(secret.strip().encode()).hexdigest()
+
+    def _setup_cipher(self, salt: bytes) -> None:
+        self._salt = salt
+        self._cipher_key = hashlib.pbkdf2_hmac(
+            "sha256", self.password.encode(), salt, self.KDF_ITERATIONS
+        )
+
+    def _encrypt(self, private_key: bytes) -> dict:
+        cipher = AES.new(self._cipher_key, AES.MODE_GCM)
+        ciphertext, tag = cipher.encrypt_and_digest(private_key)
+        return {
+            "nonce": cipher.nonce.hex(),
+            "ciphertext": ciphertext.hex(),
+            "tag": tag.hex(),
+        }
+
+    def _decrypt(self, entry: dict) -> bytes:
+        cipher = AES.new(
+            self._cipher_key, AES.MODE_GCM, nonce=bytes.fromhex(entry["nonce"])
+        )
+        return cipher.decrypt_and_verify(
+            bytes.fromhex(entry["ciphertext"]), bytes.fromhex(entry["tag"])
+        )
+
+    def load(self) -> None:
+        if not os.path.exists(self.path):
+            self._setup_cipher(os.urandom(16))
+            return
+
+        with open(self.path, "r") as file:
+            data = json.load(file)
+
+        self._setup_cipher(bytes.fromhex(data["salt"]))
+        self._encrypted = data.get("keys", {})
+
+        if self._encrypted:
+            try:
+                self._decrypt(next(iter(self._encrypted.values())))
+            except ValueError:
+                logger.error(
+                    f"Failed to decrypt keystore <<{self.path}>> | Check keystore_password in settings.yaml"
+                )
+                exit(1)
+
+    def save(self) -> None:
+        if not self.password or not self._dirty:
+            return
+
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as file:
+            json.dump({"salt": self._salt.hex(), "keys": self._encrypted}, file)
+
+        os.replace(temp_path, self.path)
+        self._dirty = False
+
+    def __contains__(self, secret: str) -> bool:
+        fingerprint = self.fingerprint(secret)
+        return fingerprint in self._keypairs or fingerprint in self._encrypted
+
+    def add(self, secret: str, private_key: bytes) -> LocalAccount:
+        fingerprint = self.fingerprint(secret)
+        keypair = Account.from_key(private_key)
+        self._keypairs[fingerprint] = keypair
+
+        if self.password and fingerprint not in self._encrypted:
+            self._encrypted[fingerprint] = self._encrypt(private_key)
+            self._dirty = True
+
+        return keypair
+
+    def get_keypair(self, secret: str) -> LocalAccount:
+        fingerprint = self.fingerprint(secret)
+        if fingerprint in self._keypairs:
+            return self._keypairs[fingerprint]
+
+        if fingerprint in self._encrypted:
+            private_key = self._decrypt(self._encrypted[fingerprint])
+        else:
+            private_key = derive_private_key(secret)
+
+        return self.add(secret, private_key)
+
+    def preload(self, secrets: list[str], workers: int = 0) -> None:
+        pending = list(
+            dict.fromkeys(secret for secret in secrets if secret and secret not in self)
+        )
+        if not pending:
+            return
+
+        workers = min(workers or os.cpu_count() or 1, len(pending))
+        logger.info(f"Deriving {len(pending)} keys | Workers: {workers}..")
+        started = time.perf_counter()
+
+        if workers > 1:
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+                private_keys = list(
+                    executor.map(
+                        derive_private_key,
+                        pending,
+                        chunksize=math.ceil(len(pending) / (workers * 4)),
+                    )
+                )
+        else:
+            private_keys = [derive_private_key(secret) for secret in pending]
+
+        for secret, private_key in zip(pending, private_keys):
+            self.add(secret, private_key)
+
+        elapsed = time.perf_counter() - started
+        logger.success(
+            f"Derived {len(pending)} keys in {elapsed:.2f}s | {len(pending) / elapsed:.1f} keys/s"
+        )
+        self.save()
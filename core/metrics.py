@@ -0,0 +1,275 @@
+import asyncio
+import bisect
+from collections import defaultdict
+
+from loguru import logger
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+def _format_labels(labelnames: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.values: dict[tuple, float] = defaultdict(float)
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        self.values[self._key(labels)] += amount
+
+    def total(self, **labels) -> float:
+        return sum(
+            value
+            for key, value in self.values.items()
+            if all(key[self.labelnames.index(name)] == str(label) for name, label in labels.items())
+        )
+
+    def render(self) -> list[str]:
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {value}"
+            for key, value in self.values.items()
+        ]
+
+    def snapshot(self) -> list:
+        return [[list(key), value] for key, value in self.values.items()]
+
+    def merge(self, snapshot: list) -> None:
+        for key, value in snapshot:
+            self.values[tuple(key)] += value
+
+    def reset(self) -> None:
+        self.values.clear()
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.values[self._key(labels)] -= amount
+
+    def set(self, value: float, **labels) -> None:
+        self.values[self._key(labels)] = value
+
+
+class Histogram(Metric):
+    type = "histogram"
+    DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = buckets
+        self.counts: dict[tuple, list[int]] = defaultdict(lambda: [0] * len(self.buckets))
+        self.sums: dict[tuple, float] = defaultdict(float)
+        self.totals: dict[tuple, int] = defaultdict(int)
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            self.counts[key][index] += 1
+
+        self.sums[key] += value
+        self.totals[key] += 1
+
+    def render(self) -> list[str]:
+        lines = self.header()
+        for key, total in self.totals.items():
+            cumulative = 0
+            for bucket, count in zip(self.buckets, self.counts[key]):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, f'le="{bucket}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+
+            labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {total}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {self.sums[key]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {total}")
+
+        return lines
+
+    def snapshot(self) -> list:
+        return [
+            [list(key), self.counts[key], self.sums[key], total] for key, total in self.totals.items()
+        ]
+
+    def merge(self, snapshot: list) -> None:
+        for key, counts, value_sum, total in snapshot:
+            key = tuple(key)
+            self.counts[key] = [a + b for a, b in zip(self.counts[key], counts)]
+            self.sums[key] += value_sum
+            self.totals[key] += total
+
+    def reset(self) -> None:
+        self.counts.clear()
+        self.sums.clear()
+        self.totals.clear()
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics: dict[str, Metric] = {}
+
+    def _register(self, metric: Metric) -> Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> dict[str, list]:
+        return {name: metric.snapshot() for name, metric in self.metrics.items()}
+
+    def reset(self) -> None:
+        for metric in self.metrics.values():
+            metric.reset()
+
+    def load(self, snapshots: list[dict[str, list]]) -> None:
+        """Replaces all values with the sum of `snapshots` (e.g. the registries of several workers)"""
+        self.reset()
+        for snapshot in snapshots:
+            for name, values in snapshot.items():
+                if name in self.metrics:
+                    self.metrics[name].merge(values)
+
+
+class MetricsServer:
+    """Minimal HTTP server exposing the registry in the Prometheus text format on /metrics"""
+
+    def __init__(self, registry: MetricsRegistry, host: str = "127.0.0.1", port: int = 9100):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server: asyncio.AbstractServer | None = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+
+            parts = request_line.decode(errors="ignore").split()
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] == "/metrics":
+                status, body = "200 OK", self.registry.render().encode()
+            else:
+                status, body = "404 Not Found", b"Not Found\n"
+
+            writer.write(
+                f"HTTP/1.1 {status}\r\n"
+                f"Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: close\r\n\r\n".encode()
+                + body
+            )
+            await writer.drain()
+
+        except Exception as error:
+            logger.debug("Metrics request failed: {}", error)
+
+        finally:
+            writer.close()
+
+    async def start(self) -> None:
+        if self._server is None:
+            self._server = await asyncio.start_server(self._handle, self.host, self.port)
+            logger.info(f"Metrics available at http://{self.host}:{self.port}/metrics")
+
+
+metrics = MetricsRegistry()
+
+HTTP_REQUESTS = metrics.counter(
+    "mint_http_requests_total", "HTTP API requests", ("host", "method", "status")
+)
+HTTP_LATENCY = metrics.histogram(
+    "mint_http_request_seconds", "HTTP API request latency", ("host", "method")
+)
+API_ERRORS = metrics.counter(
+    "mint_api_errors_total", "Error codes returned by the APIs", ("method", "code")
+)
+RPC_REQUESTS = metrics.counter(
+    "mint_rpc_requests_total", "JSON-RPC requests", ("endpoint", "method", "status")
+)
+RPC_LATENCY = metrics.histogram(
+    "mint_rpc_request_seconds", "JSON-RPC request latency", ("method",)
+)
+TRANSACTIONS = metrics.counter(
+    "mint_transactions_total", "Sent transactions", ("status",)
+)
+TRANSACTION_LATENCY = metrics.histogram(
+    "mint_transaction_seconds", "Time from signing a transaction to its receipt"
+)
+GAS_SPENT = metrics.counter("mint_gas_spent_wei_total", "Gas fees paid (wei)")
+ENERGY = metrics.counter(
+    "mint_energy_total", "Energy claimed, stolen and injected", ("type",)
+)
+ACCOUNTS = metrics.counter("mint_accounts_total", "Finished accounts", ("result",))
+ACCOUNTS_IN_FLIGHT = metrics.gauge("mint_accounts_in_flight", "Accounts being processed")
+STEPS = metrics.counter("mint_steps_total", "Bot steps", ("step", "result"))
+STEP_LATENCY = metrics.histogram("mint_step_seconds", "Bot step duration", ("step",))
+CIRCUIT_OPEN = metrics.gauge("mint_circuit_open", "Hosts whose circuit breaker is open", ("host",))
+HEDGED_REQUESTS = metrics.counter(
+    "mint_hedged_requests_total", "Requests that fired a hedge request", ("method",)
+)
+HEDGE_WINS = metrics.counter(
+    "mint_hedge_wins_total", "Hedge requests that answered before the original request", ("method",)
+)
+CIRCUIT_REJECTED = metrics.counter(
+    "mint_circuit_rejected_total", "Requests rejected by an open circuit breaker", ("host",)
+)
+
+
+def summary() -> str:
+    return (
+        f"Steps: {STEPS.total(result='success'):.0f} ok, {STEPS.total(result='failed') + STEPS.total(result='error'):.0f} failed | "
+        f"API requests: {HTTP_REQUESTS.total():.0f} ({API_ERRORS.total():.0f} errors) | "
+        f"RPC requests: {RPC_REQUESTS.total():.0f} | "
+        f"Transactions: {TRANSACTIONS.total(status='success'):.0f} ok, {TRANSACTIONS.total(status='reverted'):.0f} reverted | "
+        # injected energy is energy that was collected before, not new energy
+        f"Energy: {ENERGY.total() - ENERGY.total(type='inject'):.0f}"
+    )
@@ -12,7 +12,7 @@ class CometBridge(Wallet):
         amount_to_bridge: float,
         to_address: str,
         mnemonic: str,
-        rpc_url: HttpUrl | str,
+        rpc_url: HttpUrl | str | list[HttpUrl],
     ):
         super().__init__(mnemonic, rpc_url)
         self.amount_to_bridge = amount_to_bridge
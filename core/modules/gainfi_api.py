@@ -12,6 +12,7 @@ from pydantic import HttpUrl
 from loader import config
 from models import Account
 from core.exceptions.base import APIError
+from core.circuit import circuits
 from core.wallet import Wallet
 
 
@@ -64,29 +65,33 @@ class GainfiAPI(Wallet):
 
             raise APIError(f"{_response} | Method: {method}")
 
-        if request_type == "POST":
-            if not url:
-                response = await self.session.post(
-                    f"{self.API_URL}{method}",
-                    json=json_data,
-                    params=params,
-                    headers=headers,
-                )
+        async def _send():
+            if request_type == "POST":
+                if not url:
+                    response = await self.session.post(
+                        f"{self.API_URL}{method}",
+                        json=json_data,
+                        params=params,
+                        headers=headers,
+                    )
+
+                else:
+                    response = await self.session.post(
+                        url, json=json_data, params=params, headers=headers
+                    )
 
             else:
-                response = await self.session.post(
-                    url, json=json_data, params=params, headers=headers
-                )
+                if not url:
+                    response = await self.session.get(
+                        f"{self.API_URL}{method}", params=params, headers=headers
+                    )
 
-        else:
-            if not url:
-                response = await self.session.get(
-                    f"{self.API_URL}{method}", params=params, headers=headers
-                )
+                else:
+                    response = await self.session.get(url, params=params, headers=headers)
 
-            else:
-                response = await self.session.get(url, params=params, headers=headers)
+            return response
 
+        response = await circuits.call(url or self.API_URL, _send)
         response.raise_for_status()
         if verify:
             return _verify_response(response.json())
@@ -4,6 +4,8 @@ import re
 from mailtmapi import MailTM
 from mailtmapi.schemas.account import Account
 
+from core.circuit import circuits
+
 
 class TempMail(MailTM):
     def __init__(self):
@@ -11,11 +13,11 @@ class TempMail(MailTM):
         self.account: Account | None = None
 
     async def generate_account(self, password: str = None):
-        self.account = await self.get_account(password=password)
+        self.account = await circuits.call(self.API_URL, lambda: self.get_account(password=password))
 
     async def get_verification_code(self):
         for _ in range(10):
-            messages = await self.get_messages(self.account.token.token)
+            messages = await circuits.call(self.API_URL, lambda: self.get_messages(self.account.token.token))
             for message in messages:
                 if "subject" in str(message[1]):
                     message = message[1][0]
@@ -0,0 +1,57 @@
+import asyncio
+from collections import deque
+from typing import Any
+
+from models import ForestProofData
+
+
+class ForestProofPrefetcher:
+    """Keeps up to `window` forest proof requests in flight ahead of the proof being consumed"""
+
+    def __init__(self, client: Any, requests: list[dict], window: int = 0):
+        self.client = client
+        self.requests = requests
+        self.window = window
+
+        self._tasks: deque[asyncio.Task] = deque()
+        self._position = 0
+
+    def _schedule(self, limit: int) -> None:
+        while self._position < len(self.requests) and len(self._tasks) < limit:
+            request = self.requests[self._position]
+            self._tasks.append(
+                asyncio.create_task(self.client.get_forest_proof(**request))
+            )
+            self._position += 1
+
+    @staticmethod
+    def _discard(task: asyncio.Task) -> None:
+        # retrieve the exception of a dropped request so asyncio doesn't warn about it
+        if not task.cancelled():
+            task.exception()
+
+    def cancel(self) -> None:
+        while self._tasks:
+            task = self._tasks.popleft()
+            task.cancel()
+            task.add_done_callback(self._discard)
+
+    def __aiter__(self) -> "ForestProofPrefetcher":
+        return self
+
+    async def __anext__(self) -> ForestProofData:
+        self._schedule(max(self.window, 1))
+        if not self._tasks:
+            raise StopAsyncIteration
+
+        task = self._tasks.popleft()
+        try:
+            return await task
+        finally:
+            self._schedule(self.window)
+
+    async def __aenter__(self) -> "ForestProofPrefetcher":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        self.cancel()
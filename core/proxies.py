@@ -0,0 +1,163 @@
+import asyncio
+import time
+from dataclasses import dataclass
+
+import aiohttp
+from loguru import logger
+
+from models import Account, proxy_url
+from loader import config
+
+
+@dataclass
+class ProxyCheck:
+    proxy: str
+    api_latency: float | None = None
+    rpc_latency: float | None = None
+    error: str | None = None
+
+    @property
+    def healthy(self) -> bool:
+        return self.api_latency is not None and self.api_latency <= config.proxy_max_latency
+
+
+class ProxyProber:
+    """
+    Measures the latency of every proxy to the Mint API and the Mint RPC before a run starts.
+    A proxy is healthy when the Mint API answers through it within `proxy_max_latency` seconds,
+    the RPC latency is only reported since RPC requests are not sent through account proxies.
+    """
+
+    API_URL = "https://www.mintchain.io"
+
+    def __init__(self, timeout: float = 10, concurrency: int = 50):
+        self.timeout = timeout
+        self.concurrency = concurrency
+
+    @property
+    def rpc_url(self) -> str:
+        urls = config.mint_rpc_url if isinstance(config.mint_rpc_url, list) else [config.mint_rpc_url]
+        return str(urls[0])
+
+    async def _measure(self, session: aiohttp.ClientSession, proxy: str, method: str, url: str, **kwargs) -> float:
+        started = time.perf_counter()
+        async with session.request(method, url, proxy=proxy, **kwargs) as response:
+            if response.status >= 500:
+                raise aiohttp.ClientResponseError(
+                    response.request_info, response.history, status=response.status, message=response.reason
+                )
+            await response.read()
+
+        return time.perf_counter() - started
+
+    async def check(self, session: aiohttp.ClientSession, proxy: str) -> ProxyCheck:
+        result = ProxyCheck(proxy)
+        try:
+            result.api_latency = await self._measure(session, proxy, "GET", self.API_URL)
+        except asyncio.TimeoutError:
+            result.error = f"Timed out after {self.timeout:g}s"
+            return result
+        except Exception as error:
+            result.error = str(error) or error.__class__.__name__
+            return result
+
+        try:
+            result.rpc_latency = await self._measure(
+                session,
+                proxy,
+                "POST",
+                self.rpc_url,
+                json={"jsonrpc": "2.0", "method": "eth_chainId", "params": [], "id": 1},
+            )
+        except Exception:
+            pass
+
+        return result
+
+    async def probe(self, proxies: list[str]) -> dict[str, ProxyCheck]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+
+            async def check(proxy: str) -> ProxyCheck:
+                async with semaphore:
+                    return await self.check(session, proxy)
+
+            results = await asyncio.gather(*[check(proxy) for proxy in dict.fromkeys(proxies)])
+
+        return {result.proxy: result for result in results}
+
+
+def assign_proxies(accounts: list[Account], checks: dict[str, ProxyCheck], pool: list[str]) -> list[Account]:
+    """
+    Moves accounts with a dead proxy to the healthy proxies of `pool`, the least used (then fastest) first.
+    Accounts are dropped when no healthy proxy is left.
+    """
+    healthy = sorted(
+        (proxy for proxy in dict.fromkeys(pool) if checks[proxy].healthy), key=lambda proxy: checks[proxy].api_latency
+    )
+    usage = {proxy: 0 for proxy in healthy}
+    for account in accounts:
+        if account.proxy in usage:
+            usage[account.proxy] += 1
+
+    assigned = []
+    for account in accounts:
+        if not account.proxy or checks[account.proxy].healthy:
+            assigned.append(account)
+            continue
+
+        if not healthy:
+            logger.warning(f"Account: {account.auth_token} | Proxy is dead and no healthy proxy is left | Skipped")
+            continue
+
+        proxy = min(healthy, key=lambda item: (usage[item], checks[item].api_latency))
+        usage[proxy] += 1
+        logger.info(
+            f"Account: {account.auth_token} | Proxy reassigned | Latency: {checks[proxy].api_latency * 1000:.0f} ms"
+        )
+        assigned.append(account.model_copy(update={"proxy": proxy}))
+
+    return assigned
+
+
+async def check_proxies(accounts: list[Account], extra_proxies: list[str] = None) -> list[Account]:
+    """Probes the proxies of `accounts` (and `extra_proxies`) and returns the accounts that can be run"""
+    pool = [proxy_url(proxy) for proxy in extra_proxies or []]
+    proxies = [account.proxy for account in accounts if account.proxy] + pool
+    if not proxies:
+        return accounts
+
+    logger.info(f"Checking {len(set(proxies))} proxies...")
+    checks = await ProxyProber(timeout=config.proxy_timeout).probe(proxies)
+
+    for check in checks.values():
+        host = check.proxy.rpartition("@")[2]
+        if check.error:
+            logger.warning(f"Proxy: {host} | Dead: {check.error}")
+        elif not check.healthy:
+            logger.warning(f"Proxy: {host} | Too slow | API: {check.api_latency * 1000:.0f} ms")
+        else:
+            rpc = f"{check.rpc_latency * 1000:.0f} ms" if check.rpc_latency is not None else "unreachable"
+            logger.debug(f"Proxy: {host} | API: {check.api_latency * 1000:.0f} ms | RPC: {rpc}")
+
+    healthy = sum(check.healthy for check in checks.values())
+    logger.info(f"Proxies checked | Healthy: {healthy} | Dead or slow: {len(checks) - healthy}")
+
+    if config.proxy_reassign:
+        return assign_proxies(accounts, checks, proxies)
+
+    runnable = [account for account in accounts if not account.proxy or checks[account.proxy].healthy]
+    if len(runnable) < len(accounts):
+        logger.warning(f"Skipping {len(accounts) - len(runnable)} accounts with a dead or slow proxy")
+
+    return runnable
+
+
+async def healthy_proxies(proxies: list[str]) -> list[str]:
+    """Filters a list of <<ip:port:username:password>> proxies down to the healthy ones"""
+    checks = await ProxyProber(timeout=config.proxy_timeout).probe([proxy_url(proxy) for proxy in proxies])
+    healthy = [proxy for proxy in proxies if checks[proxy_url(proxy)].healthy]
+    logger.info(f"Proxies checked | Healthy: {len(healthy)} | Dead or slow: {len(proxies) - len(healthy)}")
+    return healthy
@@ -0,0 +1,110 @@
+import asyncio
+
+from hexbytes import HexBytes
+from loguru import logger
+from web3 import AsyncWeb3
+from web3._utils.method_formatters import receipt_formatter
+from web3.exceptions import TimeExhausted, TransactionNotFound
+from web3.types import TxReceipt
+
+
+class ReceiptTracker:
+    """Resolves pending transaction receipts by following new blocks instead of polling every hash"""
+
+    def __init__(self, w3: AsyncWeb3, poll_interval: float = 1.0):
+        self.w3 = w3
+        self.poll_interval = poll_interval
+
+        self._pending: dict[HexBytes, asyncio.Future] = {}
+        self._last_block: int | None = None
+        self._scan_from: int | None = None
+        self._block_receipts_supported = True
+        self._task: asyncio.Task | None = None
+
+    async def wait(self, tx_hash: HexBytes | str, timeout: float = 120) -> TxReceipt:
+        tx_hash = HexBytes(tx_hash)
+        future = self._pending.get(tx_hash)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[tx_hash] = future
+
+        # blocks from the current one on are scanned by the follower, earlier ones are covered by the lookup below
+        current_block = await self.w3.eth.block_number
+        self._scan_from = current_block if self._scan_from is None else min(self._scan_from, current_block)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._follow())
+
+        try:
+            self._resolve(tx_hash, await self.w3.eth.get_transaction_receipt(tx_hash))
+        except TransactionNotFound:
+            pass
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            self._pending.pop(tx_hash, None)
+            raise TimeExhausted(
+                f"Transaction {tx_hash.hex()} is not in the chain after {timeout} seconds"
+            )
+
+    def _resolve(self, tx_hash: HexBytes, receipt: TxReceipt) -> None:
+        future = self._pending.pop(tx_hash, None)
+        if future is not None and not future.done():
+            future.set_result(receipt)
+
+    async def _fetch_block(self, block_number: int) -> list[TxReceipt]:
+        if self._block_receipts_supported:
+            response = await self.w3.provider.make_request(
+                "eth_getBlockReceipts", [hex(block_number)]
+            )
+            if "error" not in response and response.get("result") is not None:
+                return [receipt_formatter(receipt) for receipt in response["result"]]
+
+            logger.debug("RPC does not support eth_getBlockReceipts | Falling back to eth_getBlockByNumber")
+            self._block_receipts_supported = False
+
+        block = await self.w3.eth.get_block(block_number)
+        return list(
+            await asyncio.gather(
+                *[
+                    self.w3.eth.get_transaction_receipt(tx_hash)
+                    for tx_hash in block["transactions"]
+                    if HexBytes(tx_hash) in self._pending
+                ]
+            )
+        )
+
+    async def _process_block(self, block_number: int) -> None:
+        for receipt in await self._fetch_block(block_number):
+            self._resolve(HexBytes(receipt["transactionHash"]), receipt)
+
+    async def _follow(self) -> None:
+        while self._pending:
+            try:
+                latest = await self.w3.eth.block_number
+                start = self._last_block + 1 if self._last_block is not None else latest
+                if self._scan_from is not None:
+                    # transactions registered since the last pass may be in blocks that were already processed
+                    start = min(start, self._scan_from)
+                    self._scan_from = None
+
+                for block_number in range(start, latest + 1):
+                    await self._process_block(block_number)
+                    self._last_block = block_number
+
+            except Exception as error:
+                logger.warning(f"Receipt tracker failed to process blocks: {error}")
+
+            await asyncio.sleep(self.poll_interval)
+
+        self._last_block = None
+
+
+_trackers: dict[str, ReceiptTracker] = {}
+
+
+def get_receipt_tracker(key: str, w3: AsyncWeb3, poll_interval: float = 1.0) -> ReceiptTracker:
+    if key not in _trackers:
+        _trackers[key] = ReceiptTracker(w3, poll_interval=poll_interval)
+
+    return _trackers[key]
@@ -0,0 +1,164 @@
+import asyncio
+import time
+from typing import Any
+
+from aiohttp import ClientConnectorError
+from loguru import logger
+from web3 import AsyncHTTPProvider
+from web3.providers.async_base import AsyncBaseProvider
+from web3.types import RPCEndpoint, RPCResponse
+
+from .hedging import LatencyWindow, hedged
+from .metrics import HEDGE_WINS, HEDGED_REQUESTS, RPC_LATENCY, RPC_REQUESTS
+from .tracing import tracer
+
+
+class RPCEndpointState:
+    def __init__(self, url: str):
+        self.url = url
+        self.provider = AsyncHTTPProvider(url)
+        self.latency = LatencyWindow()
+        self.failures = 0
+        self.ejected_until = 0.0
+
+    @property
+    def healthy(self) -> bool:
+        return self.ejected_until <= time.monotonic()
+
+    @property
+    def score(self) -> float:
+        # unmeasured endpoints are tried first so every endpoint gets latency samples
+        return self.latency.average or 0.0
+
+
+class BalancedHTTPProvider(AsyncBaseProvider):
+    """Routes JSON-RPC requests to the fastest healthy endpoint, hedging slow reads and ejecting failing endpoints"""
+
+    WRITE_METHODS = ("eth_sendRawTransaction", "eth_sendTransaction")
+    # reads a transaction is built from, answered by another node they could lag behind the one it is sent to
+    PINNED_METHODS = WRITE_METHODS + ("eth_getTransactionCount", "eth_estimateGas")
+    EJECT_AFTER_FAILURES = 3
+    EJECT_SECONDS = 30
+    MIN_HEDGE_SAMPLES = 20
+    MIN_HEDGE_DELAY = 0.05
+
+    def __init__(self, urls: list[str], hedge_reads: bool = True):
+        super().__init__()
+        self.endpoints = [RPCEndpointState(url) for url in urls]
+        self.hedge_reads = hedge_reads
+        self.endpoint_uri = ",".join(urls)
+
+    def __str__(self) -> str:
+        return f"RPC connection {self.endpoint_uri}"
+
+    def ranked_endpoints(self) -> list[RPCEndpointState]:
+        healthy = [endpoint for endpoint in self.endpoints if endpoint.healthy]
+        if healthy:
+            return sorted(healthy, key=lambda endpoint: endpoint.score)
+
+        # every endpoint is ejected - fall back to the one that comes back first
+        return sorted(self.endpoints, key=lambda endpoint: endpoint.ejected_until)
+
+    async def _request(
+        self, endpoint: RPCEndpointState, method: RPCEndpoint, params: Any
+    ) -> RPCResponse:
+        with tracer.span(method, category="rpc", endpoint=endpoint.url):
+            started = time.perf_counter()
+            try:
+                response = await endpoint.provider.make_request(method, params)
+
+            except asyncio.CancelledError:
+                # a hedged request that lost the race, its elapsed time is a lower bound of its latency
+                endpoint.latency.add(time.perf_counter() - started)
+                raise
+
+            except Exception:
+                RPC_REQUESTS.inc(endpoint=endpoint.url, method=method, status="error")
+                endpoint.failures += 1
+                if endpoint.failures >= self.EJECT_AFTER_FAILURES:
+                    endpoint.ejected_until = time.monotonic() + self.EJECT_SECONDS
+                    logger.warning(
+                        f"RPC endpoint ejected for {self.EJECT_SECONDS}s after {endpoint.failures} failures: {endpoint.url}"
+                    )
+                raise
+
+            latency = time.perf_counter() - started
+            endpoint.latency.add(latency)
+            endpoint.failures = 0
+
+            RPC_LATENCY.observe(latency, method=method)
+            RPC_REQUESTS.inc(
+                endpoint=endpoint.url,
+                method=method,
+                status="rpc_error" if "error" in response else "ok",
+            )
+
+        return response
+
+    def hedge_delay(self, endpoint: RPCEndpointState) -> float | None:
+        if len(endpoint.latency) < self.MIN_HEDGE_SAMPLES:
+            return None
+
+        return max(endpoint.latency.percentile(95), self.MIN_HEDGE_DELAY)
+
+    async def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        endpoints = self.ranked_endpoints()
+        primary = endpoints[0]
+
+        if (
+            self.hedge_reads
+            and method not in self.PINNED_METHODS
+            and len(endpoints) > 1
+            and self.hedge_delay(primary) is not None
+        ):
+            secondary = endpoints[1]
+            try:
+                response, fired, won = await hedged(
+                    lambda: self._request(primary, method, params),
+                    lambda: self._request(secondary, method, params),
+                    self.hedge_delay(primary),
+                )
+                if fired:
+                    HEDGED_REQUESTS.inc(method=method)
+                if won:
+                    HEDGE_WINS.inc(method=method)
+                return response
+
+            except Exception:
+                endpoints = endpoints[2:]
+                if not endpoints:
+                    raise
+
+        error = None
+        for endpoint in endpoints:
+            try:
+                return await self._request(endpoint, method, params)
+            except ClientConnectorError as exc:
+                error = exc
+            except Exception as exc:
+                # a node may have accepted the transaction before failing, sending it to another
+                # endpoint would only end in "already known" or nonce errors
+                if method in self.PINNED_METHODS:
+                    raise
+
+                error = exc
+
+        raise error
+
+    async def is_connected(self, show_traceback: bool = False) -> bool:
+        for endpoint in self.ranked_endpoints():
+            if await endpoint.provider.is_connected(show_traceback):
+                return True
+
+        return False
+
+
+_providers: dict[tuple[str, ...], BalancedHTTPProvider] = {}
+
+
+def get_provider(urls: Any, hedge_reads: bool = True) -> BalancedHTTPProvider:
+    urls = tuple(str(url) for url in (urls if isinstance(urls, list) else [urls]))
+    if urls not in _providers:
+        _providers[urls] = BalancedHTTPProvider(list(urls), hedge_reads=hedge_reads)
+
+    return _providers[urls]
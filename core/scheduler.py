@@ -0,0 +1,137 @@
+import asyncio
+import heapq
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable
+
+from loguru import logger
+
+from models import Account
+from loader import config, keystore, state
+
+
+# modules that claim the daily reward, they are not woken up before it unfreezes
+DAILY_REWARD_MODULES = ("rewards", "only_rewards")
+
+
+def daily_reward_available_at(address: str) -> float:
+    """Time of the first daily reset after the last recorded claim (0 if no claim was recorded)"""
+    row = state.get(address, "daily_reward")
+    if row is None or row["completed_at"] is None:
+        return 0
+
+    claimed_at = datetime.fromtimestamp(row["completed_at"], timezone.utc)
+    reset = claimed_at.replace(hour=config.daily_reset_hour, minute=0, second=0, microsecond=0)
+    if reset <= claimed_at:
+        reset += timedelta(days=1)
+
+    return reset.timestamp()
+
+
+class Scheduler:
+    """
+    Runs the selected module (or pipeline) for every account once per `interval` seconds.
+    Accounts without a previous run are spread evenly over the first interval, afterwards each account
+    is due `interval` after its last completed run, so the load stays spread over the day.
+    Failed runs are retried after `retry_delay` seconds. Accounts running a daily reward module
+    are never woken before their daily reward unfreezes.
+    """
+
+    def __init__(
+        self,
+        accounts: list[Account],
+        run_account: Callable[[Account], Awaitable],
+        one_time_modules: tuple[str, ...],
+        interval: float = 86400,
+        retry_delay: float = 1800,
+    ):
+        self.accounts = accounts
+        self.run_account = run_account
+        self.one_time_modules = one_time_modules
+        self.interval = interval
+        self.retry_delay = retry_delay
+
+        self.modules = config.pipeline if config.module == "pipeline" else [config.module]
+        self._queue: list[tuple[float, int, Account]] = []
+        self._running: set[asyncio.Task] = set()
+
+    def next_run(self, account: Account) -> float | None:
+        """Timestamp of the next run, 0 if the account never ran, None if there is nothing left to do"""
+        address = keystore.get_keypair(account.pk_or_mnemonic).address
+        due = self._next_run(address)
+        if due is not None and any(module in DAILY_REWARD_MODULES for module in self.modules):
+            available_at = daily_reward_available_at(address)
+            if available_at > time.time():
+                due = max(due, available_at)
+
+        return due
+
+    def _next_run(self, address: str) -> float | None:
+        rows = [state.get(address, module) for module in self.modules]
+        if any(row is None for row in rows):
+            return 0
+
+        if all(row["completed_at"] for row in rows) and all(
+            module in self.one_time_modules for module in self.modules
+        ):
+            return None
+
+        if any(row["status"] == "failed" for row in rows):
+            return max(row["updated_at"] for row in rows) + self.retry_delay
+
+        return min(row["completed_at"] for row in rows) + self.interval
+
+    def schedule(self, index: int, account: Account, due: float | None) -> None:
+        if due is None:
+            logger.info(
+                f"Account: {account.auth_token} | {', '.join(self.modules)} already completed | Not scheduled"
+            )
+            return
+
+        heapq.heappush(self._queue, (due, index, account))
+
+    async def _run(self, index: int, account: Account) -> None:
+        try:
+            await self.run_account(account)
+        except Exception as error:
+            logger.error(f"Account: {account.auth_token} | Scheduled run failed: {error}")
+
+        due = self.next_run(account)
+        if due is not None and due <= time.time():
+            # nothing was recorded (e.g. the run was interrupted), don't retry in a tight loop
+            due = time.time() + self.retry_delay
+
+        self.schedule(index, account, due)
+        if due is not None:
+            logger.info(
+                f"Account: {account.auth_token} | Next run at {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(due))}"
+            )
+
+    async def run(self) -> None:
+        now = time.time()
+        due_times = [self.next_run(account) for account in self.accounts]
+        new_accounts = due_times.count(0)
+        slot = 0
+        for index, (account, due) in enumerate(zip(self.accounts, due_times)):
+            if due == 0:
+                due = now + slot * self.interval / new_accounts
+                slot += 1
+
+            self.schedule(index, account, due)
+
+        logger.info(
+            f"Scheduler started | Module: {', '.join(self.modules)} | Accounts: {len(self._queue)} | "
+            f"Interval: {self.interval / 3600:g}h"
+        )
+
+        while self._queue or self._running:
+            if not self._queue or self._queue[0][0] > time.time():
+                # short sleeps so retries scheduled by finished runs are picked up in time
+                wait = self._queue[0][0] - time.time() if self._queue else 60
+                await asyncio.sleep(min(max(wait, 0), 60))
+                continue
+
+            _, index, account = heapq.heappop(self._queue)
+            task = asyncio.create_task(self._run(index, account))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
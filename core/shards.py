@@ -0,0 +1,122 @@
+import asyncio
+import multiprocessing
+import queue
+from typing import Any, Callable
+
+from loguru import logger
+
+from .metrics import metrics
+from .tracing import tracer
+
+
+class ShardChannel:
+    """Shard side of the pool: forwards logs, metrics and the final result to the parent process"""
+
+    def __init__(self, index: int, messages: multiprocessing.Queue):
+        self.index = index
+        self.messages = messages
+
+    def forward_logs(self, level: str) -> None:
+        logger.remove()
+        logger.add(self._log_sink, level=level, format="{message}")
+
+    def _log_sink(self, message) -> None:
+        record = message.record
+        self.messages.put(
+            (
+                "log",
+                self.index,
+                {
+                    "level": record["level"].name,
+                    "message": str(message).rstrip("\n"),
+                    "extra": dict(record["extra"]),
+                    "name": record["name"],
+                    "function": record["function"],
+                    "line": record["line"],
+                },
+            )
+        )
+
+    def send_metrics(self) -> None:
+        self.messages.put(("metrics", self.index, metrics.snapshot()))
+
+    async def report_metrics(self, interval: float = 1) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            self.send_metrics()
+
+    def finish(self, result: Any) -> None:
+        self.send_metrics()
+        self.messages.put(("done", self.index, {"result": result, "trace": tracer.dump()}))
+
+
+class ShardPool:
+    """
+    Runs `target(channel, accounts, threads, *args)` in `workers` spawned processes, each with its own event loop,
+    a share of the accounts and a share of `threads`. Shard logs are written by the sinks of this process,
+    shard metrics are summed into the local registry and shard spans are merged into the local tracer.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._snapshots: dict[int, dict] = {}
+
+    @staticmethod
+    def split(items: list, parts: int) -> list[list]:
+        return [items[index::parts] for index in range(parts) if items[index::parts]]
+
+    @staticmethod
+    def _log(payload: dict) -> None:
+        def restore_origin(record):
+            record.update(name=payload["name"], function=payload["function"], line=payload["line"])
+
+        logger.bind(**payload["extra"]).patch(restore_origin).log(payload["level"], payload["message"])
+
+    def _update_metrics(self, index: int, snapshot: dict) -> None:
+        self._snapshots[index] = snapshot
+        metrics.load(list(self._snapshots.values()))
+
+    async def run(self, target: Callable, accounts: list, threads: int, *args) -> list:
+        """Returns the result of every shard, None for a shard that crashed"""
+        context = multiprocessing.get_context("spawn")
+        messages = context.Queue()
+        shards = self.split(accounts, self.workers)
+
+        processes = []
+        for index, shard in enumerate(shards):
+            share = max(threads // len(shards) + (index < threads % len(shards)), 1)
+            process = context.Process(
+                target=target, args=(ShardChannel(index, messages), shard, share, *args), daemon=True
+            )
+            process.start()
+            processes.append(process)
+
+        logger.info(f"Started {len(processes)} worker processes for {len(accounts)} accounts")
+
+        loop = asyncio.get_running_loop()
+        results: dict[int, Any] = {}
+
+        def read_messages() -> None:
+            while len(results) < len(processes):
+                try:
+                    kind, index, payload = messages.get(timeout=1)
+                except queue.Empty:
+                    for index, process in enumerate(processes):
+                        if index not in results and not process.is_alive():
+                            logger.error(f"Worker process {index} exited with code {process.exitcode}")
+                            results[index] = None
+                    continue
+
+                if kind == "log":
+                    self._log(payload)
+                elif kind == "metrics":
+                    loop.call_soon_threadsafe(self._update_metrics, index, payload)
+                elif kind == "done":
+                    loop.call_soon_threadsafe(tracer.merge, payload["trace"])
+                    results[index] = payload["result"]
+
+        await asyncio.to_thread(read_messages)
+        for process in processes:
+            process.join()
+
+        return [results[index] for index in range(len(processes))]
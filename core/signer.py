@@ -0,0 +1,80 @@
+import asyncio
+import math
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Literal
+
+from eth_account import Account
+from eth_account.messages import encode_defunct
+from eth_account.signers.local import LocalAccount
+
+
+def _sign_transaction(private_key: bytes, trx: dict) -> bytes:
+    signed = Account.sign_transaction(trx, private_key)
+    return bytes(signed.rawTransaction)
+
+
+def _sign_transactions(items: list[tuple[bytes, dict]]) -> list[bytes]:
+    return [_sign_transaction(private_key, trx) for private_key, trx in items]
+
+
+def _sign_message(private_key: bytes, text: str) -> str:
+    signed = Account.sign_message(encode_defunct(text=text), private_key)
+    return signed.signature.hex()
+
+
+class TransactionSigner:
+    """Offloads secp256k1 signing and RLP encoding from the event loop to a worker pool"""
+
+    def __init__(self, workers: int = 0, pool: Literal["thread", "process"] = "process"):
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = pool
+        self._executor: Executor | None = None
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.pool == "process":
+                # forking the event loop's process would copy its sockets and locks into the workers
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="signer"
+                )
+
+        return self._executor
+
+    async def _run(self, func: callable, *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    async def sign_transaction(self, keypair: LocalAccount, trx: dict) -> bytes:
+        return await self._run(_sign_transaction, bytes(keypair.key), dict(trx))
+
+    async def sign_transactions(
+        self, items: list[tuple[LocalAccount, dict]]
+    ) -> list[bytes]:
+        if not items:
+            return []
+
+        payload = [(bytes(keypair.key), dict(trx)) for keypair, trx in items]
+        chunk_size = math.ceil(len(payload) / self.workers)
+        chunks = [
+            payload[i : i + chunk_size] for i in range(0, len(payload), chunk_size)
+        ]
+
+        results = await asyncio.gather(
+            *[self._run(_sign_transactions, chunk) for chunk in chunks]
+        )
+        return [raw_transaction for chunk in results for raw_transaction in chunk]
+
+    async def sign_message(self, keypair: LocalAccount, text: str) -> str:
+        return await self._run(_sign_message, bytes(keypair.key), text)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,115 @@
+import json
+import sqlite3
+import time
+
+
+class StateStore:
+    """Per-account module results, Mint API and Twitter sessions kept in a local SQLite database"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._connection: sqlite3.Connection | None = None
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path)
+            self._connection.row_factory = sqlite3.Row
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS module_runs (
+                    address TEXT NOT NULL,
+                    module TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    completed_at REAL,
+                    PRIMARY KEY (address, module)
+                );
+                CREATE TABLE IF NOT EXISTS sessions (
+                    address TEXT PRIMARY KEY,
+                    access_token TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS twitter_sessions (
+                    auth_token TEXT PRIMARY KEY,
+                    cookies TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                );
+                """
+            )
+
+        return self._connection
+
+    def record(self, address: str, module: str, completed: bool) -> None:
+        now = time.time()
+        self.connection.execute(
+            """
+            INSERT INTO module_runs (address, module, status, updated_at, completed_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (address, module) DO UPDATE SET
+                status = excluded.status,
+                updated_at = excluded.updated_at,
+                completed_at = COALESCE(excluded.completed_at, module_runs.completed_at)
+            """,
+            (address, module, "completed" if completed else "failed", now, now if completed else None),
+        )
+        self.connection.commit()
+
+    def get(self, address: str, module: str) -> sqlite3.Row | None:
+        return self.connection.execute(
+            "SELECT * FROM module_runs WHERE address = ? AND module = ?", (address, module)
+        ).fetchone()
+
+    def is_completed(self, address: str, module: str) -> bool:
+        row = self.get(address, module)
+        return row is not None and row["completed_at"] is not None
+
+    def completed(self, module: str) -> set[str]:
+        rows = self.connection.execute(
+            "SELECT address FROM module_runs WHERE module = ? AND completed_at IS NOT NULL",
+            (module,),
+        )
+        return {row["address"] for row in rows}
+
+    def save_session(self, address: str, access_token: str, expires_at: float) -> None:
+        self.connection.execute(
+            "INSERT OR REPLACE INTO sessions (address, access_token, expires_at) VALUES (?, ?, ?)",
+            (address, access_token, expires_at),
+        )
+        self.connection.commit()
+
+    def get_session(self, address: str, min_lifetime: float = 300) -> str | None:
+        row = self.connection.execute(
+            "SELECT access_token, expires_at FROM sessions WHERE address = ?", (address,)
+        ).fetchone()
+        if row is None or row["expires_at"] - time.time() < min_lifetime:
+            return None
+
+        return row["access_token"]
+
+    def drop_session(self, address: str) -> None:
+        self.connection.execute("DELETE FROM sessions WHERE address = ?", (address,))
+        self.connection.commit()
+
+    def save_twitter_cookies(self, auth_token: str, cookies: dict[str, str]) -> None:
+        self.connection.execute(
+            "INSERT OR REPLACE INTO twitter_sessions (auth_token, cookies, updated_at) VALUES (?, ?, ?)",
+            (auth_token, json.dumps(cookies), time.time()),
+        )
+        self.connection.commit()
+
+    def get_twitter_cookies(self, auth_token: str) -> dict[str, str] | None:
+        row = self.connection.execute(
+            "SELECT cookies FROM twitter_sessions WHERE auth_token = ?", (auth_token,)
+        ).fetchone()
+        return json.loads(row["cookies"]) if row else None
+
+    def drop_twitter_cookies(self, auth_token: str) -> None:
+        self.connection.execute("DELETE FROM twitter_sessions WHERE auth_token = ?", (auth_token,))
+        self.connection.commit()
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
@@ -0,0 +1,100 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from loguru import logger
+
+current_account: ContextVar[str] = ContextVar("current_account", default="main")
+
+
+class Tracer:
+    """Collects per-account spans and exports them in the Chrome trace event format"""
+
+    def __init__(self):
+        self.enabled = False
+        self.reset()
+
+    def reset(self) -> None:
+        self.events: list[dict] = []
+        self._thread_ids: dict[str, int] = {}
+        self._merged_threads: list[tuple[int, dict[str, int]]] = []
+        self._origin = time.perf_counter()
+        self._origin_time = time.time()
+
+    def _thread_id(self, account: str) -> int:
+        if account not in self._thread_ids:
+            self._thread_ids[account] = len(self._thread_ids) + 1
+
+        return self._thread_ids[account]
+
+    @staticmethod
+    def set_account(account: str) -> None:
+        current_account.set(account)
+
+    @contextmanager
+    def span(self, name: str, category: str = "bot", **args) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.events.append(
+                {
+                    "name": name,
+                    "cat": category,
+                    "ph": "X",
+                    "ts": (started - self._origin) * 1_000_000,
+                    "dur": (time.perf_counter() - started) * 1_000_000,
+                    "pid": os.getpid(),
+                    "tid": self._thread_id(current_account.get()),
+                    "args": args,
+                }
+            )
+
+    def dump(self) -> dict:
+        return {
+            "pid": os.getpid(),
+            "origin": self._origin_time,
+            "threads": self._thread_ids,
+            "events": self.events,
+        }
+
+    def merge(self, dump: dict) -> None:
+        """Adds the spans of another process (see dump()) on the same time axis"""
+        offset = (dump["origin"] - self._origin_time) * 1_000_000
+        for event in dump["events"]:
+            self.events.append({**event, "ts": event["ts"] + offset})
+
+        self._merged_threads.append((dump["pid"], dump["threads"]))
+
+    def export(self, path: str) -> None:
+        if not self.enabled:
+            return
+
+        metadata = [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": pid,
+                "tid": thread_id,
+                "args": {"name": account},
+            }
+            for pid, threads in [(os.getpid(), self._thread_ids), *self._merged_threads]
+            for account, thread_id in threads.items()
+        ]
+
+        with open(path, "w") as file:
+            json.dump({"traceEvents": metadata + self.events, "displayTimeUnit": "ms"}, file)
+
+        logger.success(f"Trace with {len(self.events)} spans exported to {path}")
+        # every run gets its own trace
+        self.reset()
+
+
+tracer = Tracer()
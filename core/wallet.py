@@ -1,13 +1,14 @@
+import asyncio
 import random
+import time
 from typing import Any, Literal
 
 from eth_account import Account
-from eth_account.messages import encode_defunct
 from pydantic import HttpUrl
 from web3 import AsyncWeb3
 from web3.contract import AsyncContract
 from web3.eth import AsyncEth
-from web3.types import Nonce
+from web3.types import Nonce, TxReceipt
 
 from models import (
     LoginData,
@@ -23,22 +24,24 @@ from models import (
     Vip3MintData,
     GreenIDData, GainfiMintData,
 )
-
-Account.enable_unaudited_hdwallet_features()
+from loader import config, signer, keystore
+from .receipts import get_receipt_tracker
+from .rpc import get_provider
+from .metrics import GAS_SPENT, TRANSACTIONS, TRANSACTION_LATENCY
+from .tracing import tracer
 
 
 class Wallet(AsyncWeb3, Account):
-    def __init__(self, mnemonic: str, rpc_url: HttpUrl | str):
+    # Mint Forest contract: https://explorer.mintchain.io/address/0x12906892AaA384ad59F2c431867af6632c68100a
+    FOREST_CONTRACT = "0x12906892AaA384ad59F2c431867af6632c68100a"
+
+    def __init__(self, mnemonic: str, rpc_url: HttpUrl | str | list[HttpUrl]):
         super().__init__(
-            AsyncWeb3.AsyncHTTPProvider(str(rpc_url)),
+            get_provider(rpc_url, hedge_reads=config.rpc_hedge_reads),
             modules={"eth": (AsyncEth,)},
             middlewares=[],
         )
-        self.keypair = (
-            self.from_mnemonic(mnemonic)
-            if len(mnemonic.split()) in (12, 24)
-            else self.from_key(mnemonic)
-        )
+        self.keypair = keystore.get_keypair(mnemonic)
 
     @property
     def get_commemorative_nft_contract(self) -> AsyncContract:
@@ -126,7 +129,8 @@ class Wallet(AsyncWeb3, Account):
         )
 
     async def transactions_count(self) -> Nonce:
-        return await self.eth.get_transaction_count(self.keypair.address)
+        # counts transactions still in the mempool, so a resend after a timeout doesn't reuse their nonce
+        return await self.eth.get_transaction_count(self.keypair.address, "pending")
 
     async def check_balance(self) -> None:
         balance = await self.eth.get_balance(self.keypair.address)
@@ -349,6 +353,31 @@ class Wallet(AsyncWeb3, Account):
 
         return transaction
 
+    async def build_forest_transaction(self, data: str, nonce: int = None) -> dict:
+        requests = [
+            self.eth.gas_price,
+            self.eth.estimate_gas({
+                "from": self.keypair.address,
+                "to": self.FOREST_CONTRACT,
+                "data": data
+            }),
+        ]
+        if nonce is None:
+            requests.append(self.transactions_count())
+
+        gas_price, gas, *pending_nonce = await asyncio.gather(*requests)
+        if pending_nonce:
+            nonce = pending_nonce[0]
+
+        return {
+            "from": self.keypair.address,
+            "to": self.FOREST_CONTRACT,
+            "gasPrice": gas_price,
+            "nonce": nonce,
+            "gas": int(gas * 1.2),
+            "data": data
+        }
+
     @property
     def get_forest_message(self) -> str:
         message = f"You are participating in the Mint Forest event: \n {self.keypair.address}\n\nNonce: {str(random.randint(1000000, 9000000))}"
@@ -359,17 +388,63 @@ class Wallet(AsyncWeb3, Account):
         message = f"You are participating in the Mint Airdrop event: \n {self.keypair.address}\n\nNonce: {str(random.randint(1000000, 9000000))}"
         return message
 
-    def sign_mint_message(self, type_: Literal["airdrop", "forest"]) -> LoginData:
+    async def sign_mint_message(
+        self, type_: Literal["airdrop", "forest"]
+    ) -> LoginData:
         if type_ == "forest":
             message = self.get_forest_message
         else:
             message = self.get_airdrop_message
-        encoded_message = encode_defunct(text=message)
-        signed_message = self.keypair.sign_message(encoded_message)
-        return LoginData(message=message, signed_message=signed_message.signature.hex())
+
+        signed_message = await signer.sign_message(self.keypair, message)
+        return LoginData(message=message, signed_message=signed_message)
+
+    async def wait_for_receipt(self, tx_hash: Any) -> TxReceipt:
+        if config.receipt_tracking == "blocks":
+            tracker = get_receipt_tracker(
+                self.provider.endpoint_uri, self, config.receipt_poll_interval
+            )
+            return await tracker.wait(tx_hash)
+
+        return await self.eth.wait_for_transaction_receipt(tx_hash)
+
+    @staticmethod
+    def record_transaction(receipt: TxReceipt, started: float) -> None:
+        TRANSACTIONS.inc(status="success" if receipt["status"] == 1 else "reverted")
+        TRANSACTION_LATENCY.observe(time.perf_counter() - started)
+        GAS_SPENT.inc(receipt["gasUsed"] * receipt.get("effectiveGasPrice", 0))
 
     async def send_and_verify_transaction(self, trx: Any) -> tuple[bool | Any, str]:
-        signed = self.keypair.sign_transaction(trx)
-        tx_hash = await self.eth.send_raw_transaction(signed.rawTransaction)
-        receipt = await self.eth.wait_for_transaction_receipt(tx_hash)
+        started = time.perf_counter()
+        with tracer.span("transaction", category="chain"):
+            raw_transaction = await signer.sign_transaction(self.keypair, trx)
+            tx_hash = await self.eth.send_raw_transaction(raw_transaction)
+            receipt = await self.wait_for_receipt(tx_hash)
+
+        self.record_transaction(receipt, started)
         return receipt["status"] == 1, tx_hash.hex()
+
+    async def send_and_verify_transactions(
+        self, trxs: list[Any]
+    ) -> list[tuple[bool | Any, str]]:
+        started = time.perf_counter()
+        with tracer.span("transactions", category="chain", count=len(trxs)):
+            raw_transactions = await signer.sign_transactions(
+                [(self.keypair, trx) for trx in trxs]
+            )
+
+            tx_hashes = []
+            for raw_transaction in raw_transactions:
+                tx_hashes.append(await self.eth.send_raw_transaction(raw_transaction))
+
+            receipts = await asyncio.gather(
+                *[self.wait_for_receipt(tx_hash) for tx_hash in tx_hashes]
+            )
+
+        for receipt in receipts:
+            self.record_transaction(receipt, started)
+
+        return [
+            (receipt["status"] == 1, tx_hash.hex())
+            for receipt, tx_hash in zip(receipts, tx_hashes)
+        ]
@@ -2,6 +2,12 @@ import asyncio
 
 from models import Config
 from utils import load_config
+from core.signer import TransactionSigner
+from core.keystore import KeyStore
+from core.state import StateStore
 
 config: Config = load_config()
 semaphore = asyncio.Semaphore(config.threads)
+signer = TransactionSigner(workers=config.signer_workers, pool=config.signer_pool)
+keystore = KeyStore(path="./config/keystore.json", password=config.keystore_password)
+state = StateStore(path="./config/state.db")
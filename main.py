@@ -1,40 +1,132 @@
+import argparse
 import asyncio
+import os
 import sys
 import random
-from typing import Any
+import time
+from typing import Any, Awaitable
 
+import colorama
 import urllib3
 
 
 from loguru import logger
-from loader import config, semaphore
+from loader import config, semaphore, keystore, signer, state
 from core.bot import Bot
+from core.metrics import ACCOUNTS, ACCOUNTS_IN_FLIGHT, MetricsServer, metrics, summary as metrics_summary
+from core.tracing import tracer
+from core.scheduler import Scheduler, daily_reward_available_at
+from core.jobs import JobQueue, Worker
+from core.shards import ShardChannel, ShardPool
+from core.proxies import check_proxies, healthy_proxies
 from models import Account
-from console import Console
-from utils import export_trees_ids
+from console import Console, Dashboard
+from utils import export_trees_ids, BatchedWriter, Profiler, load_proxies, select_accounts
+
+
+ACCOUNT_MODULES = (
+    "bridge",
+    "rewards",
+    "tasks",
+    "fix_sign",
+    "mint_comm_nft",
+    "only_rewards",
+    "mint_omnihub",
+    "mint_make_nft_great_again",
+    "mint_summer_nft",
+    "mint_flag",
+    "mint_shop",
+    "mint_air3",
+    "mint_supermint",
+    "comet_bridge",
+    "mint_all_nfts",
+    "mint_owlto_summer_nft",
+    "mint_omnihub_summer_nft",
+    "mint_random_all_nfts",
+    "mint_vip3_nft",
+    "mint_green_id",
+    "mint_gainfi_nft",
+    "pipeline",
+)
+# modules --workers can split between processes
+SHARDED_MODULES = ACCOUNT_MODULES + ("export_trees_ids",)
+# seconds without a heartbeat after which a worker's running jobs are handed to other workers
+WORKER_TIMEOUT = 60
 
 
 def setup():
     urllib3.disable_warnings()
+    colorama.just_fix_windows_console()
     logger.remove()
+
+    if config.dashboard:
+        # the live dashboard replaces console logs except warnings and errors, all logs still go to logs.log
+        logger.add(
+            Dashboard.log_sink,
+            colorize=True,
+            level="WARNING",
+            format="<light-cyan>{time:HH:mm:ss}</light-cyan> | <level> {level: <8}</level> | - <white>{"
+            "message}</white>",
+        )
+
+    elif config.quiet_mode:
+        logger.add(
+            BatchedWriter(sys.stdout),
+            colorize=True,
+            format="<light-cyan>{time:HH:mm:ss}</light-cyan> | <white>{message}</white>",
+            filter=lambda record: "summary" in record["extra"],
+        )
+    else:
+        logger.add(
+            BatchedWriter(sys.stdout),
+            colorize=True,
+            level=config.log_level,
+            format="<light-cyan>{time:HH:mm:ss}</light-cyan> | <level> {level: <8}</level> | - <white>{"
+            "message}</white>",
+        )
+
     logger.add(
-        sys.stdout,
-        colorize=True,
-        format="<light-cyan>{time:HH:mm:ss}</light-cyan> | <level> {level: <8}</level> | - <white>{"
-        "message}</white>",
+        "logs.log",
+        rotation="1 day",
+        retention="7 days",
+        level=config.log_level,
+        serialize=config.log_format == "json",
     )
-    logger.add("logs.log", rotation="1 day", retention="7 days")
 
 
-async def run_safe(account: Account):
-    async with semaphore:
-        await Bot(account).start()
+async def report_progress(interval: int):
+    while True:
+        await asyncio.sleep(interval)
+        logger.bind(summary=True).info(metrics_summary())
+
+
+async def run_safe(account: Account) -> str:
+    tracer.set_account(account.auth_token)
+    with tracer.span("wait_for_slot"):
+        await semaphore.acquire()
+
+    try:
+        return await Bot(account).start()
+    finally:
+        semaphore.release()
+
+
+async def track_account(operation: Awaitable) -> Any:
+    """Counts an account of a module that doesn't run through Bot.start, so the dashboard shows its progress"""
+    ACCOUNTS_IN_FLIGHT.inc()
+    result = None
+    try:
+        result = await operation
+        return result
+    finally:
+        ACCOUNTS_IN_FLIGHT.dec()
+        ACCOUNTS.inc(result="success" if result else "failed")
 
 
 async def run_get_tree_info_module(account: Account) -> tuple[Any, bool | str]:
     async with semaphore:
         client = Bot(account)
-        tree_id = await client.process_get_tree_id()
+        tree_id = await track_account(client.process_get_tree_id())
         if tree_id:
             logger.info(f"Account: {account.auth_token} | Tree ID: {tree_id}")
             return client.keypair.address, tree_id
@@ -49,89 +141,425 @@ async def run_total_user(account: Account):
         
 async def run_find_and_steal_rewards_module(account: Account, start: int, end: int, min_amount: int = None):
     async with semaphore:
-        await Bot(account).process_find_and_steal_rewards(start, end, min_amount)
+        await track_account(Bot(account).process_find_and_steal_rewards(start, end, min_amount))
 
 # ------------------------
 # End Upgrade from Mr. X
 # ------------------------
 
 
-async def run():
-    while True:
-        Console().build()
-
-        if config.module in (
-            "bridge",
-            "rewards",
-            "tasks",
-            "fix_sign",
-            "mint_comm_nft",
-            "only_rewards",
-            "mint_omnihub",
-            "mint_make_nft_great_again",
-            "mint_summer_nft",
-            "mint_flag",
-            "mint_shop",
-            "mint_air3",
-            "mint_supermint",
-            "comet_bridge",
-            "mint_all_nfts",
-            "mint_owlto_summer_nft",
-            "mint_omnihub_summer_nft",
-            "mint_random_all_nfts",
-            "mint_vip3_nft",
-            "mint_green_id",
-            "mint_gainfi_nft",
-        ):
-            tasks = [
-                asyncio.create_task(run_safe(account)) for account in config.accounts
-            ]
-            await asyncio.gather(*tasks)
-
-        elif config.module == "export_trees_ids":
-            tasks = [
-                asyncio.create_task(run_get_tree_info_module(account))
-                for account in config.accounts
-            ]
-            results = await asyncio.gather(*tasks)
-            export_trees_ids(results)
+def pending_accounts() -> list[Account]:
+    modules = config.pipeline if config.module == "pipeline" else [config.module]
+    if config.skip_completed and modules == ["only_rewards"]:
+        return claimable_accounts()
+
+    if not config.skip_completed or not all(module in Bot.ONE_TIME_MODULES for module in modules):
+        return config.accounts
+
+    completed = set.intersection(*[state.completed(module) for module in modules])
+    accounts = [
+        account
+        for account in config.accounts
+        if keystore.get_keypair(account.pk_or_mnemonic).address not in completed
+    ]
+
+    if len(accounts) < len(config.accounts):
+        logger.info(
+            f"Skipping {len(config.accounts) - len(accounts)} accounts that already completed {', '.join(modules)}"
+        )
+
+    return accounts
+
+
+def claimable_accounts() -> list[Account]:
+    # only_rewards does nothing but the daily claim, accounts that claimed since the last reset can wait
+    now = time.time()
+    accounts = [
+        account
+        for account in config.accounts
+        if daily_reward_available_at(keystore.get_keypair(account.pk_or_mnemonic).address) <= now
+    ]
+
+    if len(accounts) < len(config.accounts):
+        logger.info(
+            f"Skipping {len(config.accounts) - len(accounts)} accounts that already claimed the daily reward"
+        )
+
+    return accounts
+
+
+async def run_module(accounts: list[Account]):
+    if config.module in ACCOUNT_MODULES:
+        tasks = [
+            asyncio.create_task(run_safe(account)) for account in accounts
+        ]
+        await asyncio.gather(*tasks)
+
+    elif config.module == "export_trees_ids":
+        tasks = [
+            asyncio.create_task(run_get_tree_info_module(account))
+            for account in accounts
+        ]
+        return await asyncio.gather(*tasks)
+
+    # ------------------------
+    # Start Upgrade from Mr. X
+    # ------------------------
+    
+    elif config.module == "total_user":
+        return await track_account(run_total_user(random.choice(accounts)))
+
+    elif config.module == "find_and_steal_other_trees_rewards":
+
+        total_user = await run_total_user(random.choice(accounts))
+        
+        min_amount = config.find_and_steal_min_amount
+        start_range = int((config.find_and_steal_percentage_range_start / 100) * total_user)
+        end_range = int((config.find_and_steal_percentage_range_end / 100) * total_user)
+
+        chunk_size = (end_range - start_range) // len(accounts)
+
+        tasks = []
+
+        for i, account in enumerate(accounts):
+
+            start = start_range + (i * chunk_size)
+            end = start + chunk_size if i < len(accounts) - 1 else end_range
+            tasks.append(
+                asyncio.create_task(run_find_and_steal_rewards_module(account, start, end, min_amount))
+            )
+
+        results = await asyncio.gather(*tasks)
 
         # ------------------------
-        # Start Upgrade from Mr. X
+        # End Upgrade from Mr. X
         # ------------------------
-        
-        elif config.module == "total_user":
-            return await run_total_user(random.choice(config.accounts))
 
-        elif config.module == "find_and_steal_other_trees_rewards":
 
-            total_user = await run_total_user(random.choice(config.accounts))
-            
-            min_amount = config.find_and_steal_min_amount
-            start_range = int((config.find_and_steal_percentage_range_start / 100) * total_user)
-            end_range = int((config.find_and_steal_percentage_range_end / 100) * total_user)
+def run_shard(
+    channel: ShardChannel,
+    accounts: list[Account],
+    threads: int,
+    module: str,
+    pipeline: list[str],
+    keys: dict[str, bytes],
+):
+    global semaphore
+
+    channel.forward_logs(config.log_level)
+    # keys derived by the main process, a shard would otherwise derive its accounts' keys one by one
+    for account in accounts:
+        keystore.add(account.pk_or_mnemonic, keys[account.pk_or_mnemonic])
+
+    config.module = module
+    config.pipeline = pipeline
+    config.threads = threads
+    semaphore = asyncio.Semaphore(threads)
+    # the shards already spread signing over the cores, a nested process pool would only compete with them
+    signer.pool = "thread"
+    tracer.enabled = bool(config.trace_file)
+
+    async def main():
+        reporter = asyncio.create_task(channel.report_metrics())
+        try:
+            return await run_module(accounts)
+        finally:
+            reporter.cancel()
+
+    result = asyncio.run(main())
+    keystore.save()
+    signer.shutdown()
+    channel.finish(result)
+
+
+async def run_accounts(accounts: list[Account], workers: int = 1):
+    if workers > 1 and config.module in SHARDED_MODULES:
+        keys = {
+            account.pk_or_mnemonic: bytes(keystore.get_keypair(account.pk_or_mnemonic).key)
+            for account in accounts
+        }
+        results = await ShardPool(workers).run(
+            run_shard, accounts, config.threads, config.module, config.pipeline, keys
+        )
+        results = [result for shard in results if shard for result in shard]
+    else:
+        if workers > 1:
+            logger.info(f"{config.module} runs in a single process")
+
+        results = await run_module(accounts)
+
+    if config.module == "export_trees_ids":
+        # accounts that failed to log in have no tree id
+        export_trees_ids([result for result in results if result])
+
+    return results
+
+
+async def run_daemon(args: argparse.Namespace):
+    keystore.save()
+    await Scheduler(
+        config.accounts,
+        run_safe,
+        one_time_modules=Bot.ONE_TIME_MODULES,
+        interval=args.interval * 3600,
+        retry_delay=args.retry_delay * 60,
+    ).run()
+
+
+async def run_coordinator(args: argparse.Namespace):
+    queue = JobQueue(args.queue)
+    accounts = pending_accounts()
+    run_id = queue.publish(config.module, config.pipeline, accounts)
+    logger.info(f"Published {len(accounts)} jobs | Run: {run_id} | Queue: {args.queue}")
+
+    dashboard = None
+    if config.dashboard:
+        dashboard = Dashboard(config.module, len(accounts), refresh=config.dashboard_refresh)
+        dashboard.start()
+
+    last_report = time.monotonic()
+    while True:
+        requeued = queue.requeue_stale(run_id, timeout=WORKER_TIMEOUT)
+        if requeued:
+            logger.warning(f"Run: {run_id} | Requeued {requeued} jobs of workers that stopped responding")
+
+        # the workers' registries summed up, also served on /metrics and shown on the dashboard
+        metrics.load(queue.worker_metrics(run_id))
+        progress = queue.progress(run_id)
+        if progress.get("done", 0) + progress.get("failed", 0) >= len(accounts):
+            break
+
+        if not dashboard and time.monotonic() - last_report >= 10:
+            last_report = time.monotonic()
+            logger.info(
+                f"Run: {run_id} | Done: {progress.get('done', 0)} | Failed: {progress.get('failed', 0)} | "
+                f"Running: {progress.get('running', 0)} | Pending: {progress.get('pending', 0)} | "
+                f"Workers: {queue.workers(run_id, timeout=WORKER_TIMEOUT)}"
+            )
+
+        await asyncio.sleep(2)
+
+    if dashboard:
+        dashboard.stop()
+
+    logger.info(
+        f"Run: {run_id} finished | Done: {progress.get('done', 0)} | Failed: {progress.get('failed', 0)}"
+    )
+    logger.bind(summary=True).info(metrics_summary())
+
 
-            chunk_size = (end_range - start_range) // len(config.accounts)
+async def run_worker(args: argparse.Namespace):
+    proxies = load_proxies(args.proxies) if args.proxies else None
+    if proxies and config.proxy_check:
+        proxies = await healthy_proxies(proxies)
+        if not proxies:
+            logger.error(f"No healthy proxies in <<{args.proxies}>>")
+            exit(1)
 
-            tasks = []
+    await Worker(JobQueue(args.queue), run_safe, config.accounts, name=args.worker_name, proxies=proxies).run()
 
-            for i, account in enumerate(config.accounts):
 
-                start = start_range + (i * chunk_size)
-                end = start + chunk_size if i < len(config.accounts) - 1 else end_range
-                tasks.append(
-                    asyncio.create_task(run_find_and_steal_rewards_module(account, start, end, min_amount))
-                )
+async def run(args: argparse.Namespace, profiler: Profiler = None):
+    if config.metrics_port:
+        await MetricsServer(metrics, port=config.metrics_port).start()
 
-            results = await asyncio.gather(*tasks)
+    tracer.enabled = bool(config.trace_file)
+    if tracer.enabled and (args.daemon or args.worker):
+        # these modes never finish a run, so spans would pile up without being exported
+        logger.warning("trace_file is ignored in daemon and worker mode")
+        tracer.enabled = False
 
-            # ------------------------
-            # End Upgrade from Mr. X
-            # ------------------------
+    if config.quiet_mode and not config.dashboard:
+        asyncio.create_task(report_progress(config.quiet_report_interval))
+
+    if args.module:
+        config.module = args.module
+
+    if config.proxy_check and not args.worker:
+        proxies_path = os.path.join(os.getcwd(), "config", "proxies.txt")
+        extra_proxies = load_proxies(proxies_path) if os.path.exists(proxies_path) else None
+        config.accounts = await check_proxies(config.accounts, extra_proxies)
+
+    if args.daemon:
+        return await run_daemon(args)
+
+    if args.coordinator:
+        return await run_coordinator(args)
+
+    if args.worker:
+        return await run_worker(args)
+
+    while True:
+        if not args.module:
+            Console().build()
+
+        if config.module == "pipeline" and not config.pipeline:
+            logger.error("Pipeline is empty | Add modules to <<pipeline>> in settings.yaml")
+            if args.module:
+                exit(1)
+
+            input("\n\nPress Enter to continue...")
+            continue
+
+        accounts = pending_accounts()
+
+        dashboard = None
+        if config.dashboard:
+            # total_user asks a single account
+            dashboard = Dashboard(
+                config.module,
+                1 if config.module == "total_user" else len(accounts),
+                refresh=config.dashboard_refresh,
+            )
+            dashboard.start()
+
+        if profiler:
+            with profiler:
+                await run_accounts(accounts, args.workers)
+        else:
+            await run_accounts(accounts, args.workers)
+
+        if dashboard:
+            dashboard.stop()
+
+        if config.quiet_mode and not config.dashboard:
+            logger.bind(summary=True).info(metrics_summary())
+
+        if config.module == "total_user":
+            return
+
+        keystore.save()
+        tracer.export(config.trace_file)
+        if config.hedge_api_requests:
+            logger.info(Bot.hedge_policy.summary())
+
+        if args.module:
+            return
 
         input("\n\nPress Enter to continue...")
 
 
+def check_pipeline():
+    for module in config.pipeline:
+        if module not in Bot.PIPELINE_MODULES:
+            logger.error(
+                f"Module <<{module}>> can't be used in a pipeline | Available: {', '.join(Bot.PIPELINE_MODULES)}"
+            )
+            exit(1)
+
+
+def derive_keys():
+    secrets = [account.pk_or_mnemonic for account in config.accounts]
+    secrets.append(config.comet_bridge_wallet)
+    keystore.preload(secrets, workers=config.derivation_workers)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="MintChain Bot")
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="profile.pstats",
+        metavar="PATH",
+        help="profile every module run and save the stats to PATH (default: profile.pstats)",
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=30,
+        metavar="N",
+        help="number of hot functions printed after a profiled run",
+    )
+    parser.add_argument(
+        "--module",
+        choices=sorted(set(Console.MODULES_DATA.values())),
+        help="run this module once without the interactive menu",
+    )
+    parser.add_argument(
+        "--accounts",
+        metavar="SELECTION",
+        help='accounts to use: line numbers and ranges of accounts.txt or auth tokens, e.g. "1-10,15"',
+    )
+    parser.add_argument(
+        "--threads", type=int, metavar="N", help="number of accounts working simultaneously"
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="keep running and repeat --module for every account once per --interval",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=24,
+        metavar="HOURS",
+        help="hours between two runs of the same account in daemon mode (default: 24)",
+    )
+    parser.add_argument(
+        "--retry-delay",
+        type=float,
+        default=30,
+        metavar="MINUTES",
+        help="minutes before a failed account is retried in daemon mode (default: 30)",
+    )
+    parser.add_argument(
+        "--coordinator",
+        action="store_true",
+        help="publish --module jobs for all accounts to the job queue and wait for the workers",
+    )
+    parser.add_argument(
+        "--worker", action="store_true", help="run account jobs published to the job queue"
+    )
+    parser.add_argument(
+        "--queue",
+        default="./config/jobs.db",
+        metavar="PATH",
+        help="SQLite job queue shared by the coordinator and the workers (default: ./config/jobs.db)",
+    )
+    parser.add_argument("--worker-name", metavar="NAME", help="default: <hostname>-<pid>")
+    parser.add_argument(
+        "--proxies",
+        metavar="PATH",
+        help="file with proxies (ip:port:username:password per line) used by this worker instead of the accounts' ones",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        metavar="N",
+        help="split the accounts between N processes, each with its own event loop and a share of threads",
+    )
+    args = parser.parse_args()
+    if args.workers > 1 and (args.daemon or args.coordinator or args.worker):
+        parser.error("--workers can't be combined with --daemon, --coordinator or --worker")
+
+    for mode in ("daemon", "coordinator"):
+        if getattr(args, mode) and args.module not in ACCOUNT_MODULES:
+            parser.error(f"--{mode} requires --module with one of: {', '.join(ACCOUNT_MODULES)}")
+
+    return args
+
+
+def apply_args(args: argparse.Namespace):
+    global semaphore
+
+    if args.accounts:
+        config.accounts = select_accounts(config.accounts, args.accounts)
+        if not config.accounts:
+            logger.error(f"No accounts match <<{args.accounts}>>")
+            exit(1)
+
+    if args.threads:
+        config.threads = args.threads
+        semaphore = asyncio.Semaphore(args.threads)
+
+
 if __name__ == "__main__":
+    args = parse_args()
     setup()
-    asyncio.run(run())
+    apply_args(args)
+    check_pipeline()
+    derive_keys()
+    asyncio.run(
+        run(args, Profiler(args.profile, args.profile_top) if args.profile else None)
+    )
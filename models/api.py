@@ -107,3 +107,9 @@ class TaskListData(BaseModel):
 
     result: list[Task]
 
+
+
+class ForestProofData(BaseModel):
+    type: str
+    tx: str | None = None
+    amount: Any | None = None
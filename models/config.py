@@ -1,4 +1,6 @@
-from pydantic import BaseModel, HttpUrl, PositiveInt, PositiveFloat
+from typing import Literal
+
+from pydantic import BaseModel, Field, HttpUrl, PositiveInt, PositiveFloat, NonNegativeInt
 
 from .account import Account
 
@@ -7,8 +9,11 @@ class Config(BaseModel):
     accounts: list[Account]
     referral_code: str | int
 
-    mint_rpc_url: HttpUrl
-    arb_rpc_url: HttpUrl
+    mint_rpc_url: list[HttpUrl] | HttpUrl
+    arb_rpc_url: list[HttpUrl] | HttpUrl
+    rpc_hedge_reads: bool = True
+    hedge_api_requests: bool = False
+    hedge_api_percentile: int = Field(default=95, ge=1, le=100)
 
     threads: PositiveInt
 
@@ -22,10 +27,38 @@ class Config(BaseModel):
     mint_random_all_nfts: list[str]
     delay_between_mint_min: PositiveInt
     delay_between_mint_max: PositiveInt
+    pipeline: list[str] = []
 
     find_and_steal_percentage_range_start: int
     find_and_steal_percentage_range_end: int
     find_and_steal_min_amount: int
 
     spin_turntable_by_percentage_of_energy: int
+
+    metrics_port: NonNegativeInt = 0
+    trace_file: str = ""
+    log_level: Literal["TRACE", "DEBUG", "INFO", "SUCCESS", "WARNING", "ERROR"] = "DEBUG"
+    log_format: Literal["text", "json"] = "text"
+    quiet_mode: bool = False
+    quiet_report_interval: PositiveInt = 30
+    dashboard: bool = False
+    dashboard_refresh: PositiveFloat = 1.0
+    signer_pool: Literal["thread", "process"] = "process"
+    signer_workers: NonNegativeInt = 0
+    keystore_password: str = ""
+    derivation_workers: NonNegativeInt = 0
+    batch_forest_transactions: bool = False
+    forest_proof_prefetch: NonNegativeInt = 0
+    receipt_tracking: Literal["poll", "blocks"] = "blocks"
+    receipt_poll_interval: PositiveFloat = 1.0
+    skip_completed: bool = True
+    daily_reset_hour: int = Field(default=0, ge=0, le=23)
+    cache_sessions: bool = True
+    session_ttl: PositiveFloat = 12
+    proxy_check: bool = False
+    proxy_timeout: PositiveFloat = 10
+    proxy_max_latency: PositiveFloat = 5
+    proxy_reassign: bool = True
+    circuit_breaker_failures: NonNegativeInt = 5
+    circuit_breaker_timeout: PositiveFloat = 60
     module: str = ""
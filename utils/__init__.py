@@ -1,3 +1,5 @@
 from .console import *
 from .file_utils import *
-from .load_config import load_config
+from .load_config import load_config, load_proxies, select_accounts
+from .profiler import Profiler
+from .log_sink import BatchedWriter
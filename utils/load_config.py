@@ -74,3 +74,41 @@ def load_config() -> Config:
         random.shuffle(accounts)
 
     return Config(accounts=accounts, **settings)
+
+
+def load_proxies(path: str) -> list[str]:
+    if not os.path.exists(path):
+        logger.error(f"File <<{path}>> does not exist")
+        exit(1)
+
+    with open(path, "r") as f:
+        proxies = [line.strip() for line in f if line.strip()]
+
+    if not proxies:
+        logger.error(f"File <<{path}>> is empty")
+        exit(1)
+
+    return proxies
+
+
+def select_accounts(accounts: list[Account], selection: str) -> list[Account]:
+    """
+    Filters accounts by a comma-separated selection of line numbers (1-based) and ranges of accounts.txt,
+    e.g. "1-10,15,20-25", or by auth tokens.
+    """
+    lines = list(get_accounts())
+    selected = set()
+    for item in selection.split(","):
+        item = item.strip()
+        start, _, end = item.partition("-")
+        if start.isdigit() and (not end or end.isdigit()):
+            for number in range(int(start), int(end or start) + 1):
+                if not 1 <= number <= len(lines):
+                    logger.error(f"Account <<{number}>> does not exist | accounts.txt has {len(lines)} lines")
+                    exit(1)
+
+                selected.add(lines[number - 1].auth_token)
+        else:
+            selected.add(item)
+
+    return [account for account in accounts if account.auth_token in selected]
@@ -0,0 +1,48 @@
+import threading
+from collections import deque
+from typing import TextIO
+
+
+class BatchedWriter:
+    """
+    Loguru sink that only appends messages to a buffer; a background thread writes them to `stream`
+    in one call every `interval` seconds (or as soon as `max_batch` messages are waiting).
+    There is no flush() on purpose - loguru calls it after every message of a stream sink.
+    """
+
+    def __init__(self, stream: TextIO, interval: float = 0.2, max_batch: int = 500):
+        self.stream = stream
+        self.interval = interval
+        self.max_batch = max_batch
+
+        self._buffer: deque[str] = deque()
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, message: str) -> None:
+        self._buffer.append(message)
+        if len(self._buffer) >= self.max_batch:
+            self._wakeup.set()
+
+    def _drain(self) -> None:
+        messages = []
+        while self._buffer:
+            messages.append(self._buffer.popleft())
+
+        if messages:
+            self.stream.write("".join(messages))
+            self.stream.flush()
+
+    def _run(self) -> None:
+        while not self._stopped:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            self._drain()
+
+    def stop(self) -> None:
+        self._stopped = True
+        self._wakeup.set()
+        self._thread.join()
+        self._drain()
@@ -0,0 +1,59 @@
+import cProfile
+import io
+import pstats
+
+from loguru import logger
+
+try:
+    import yappi
+except ImportError:
+    yappi = None
+
+
+class Profiler:
+    """
+    Profiles the module run with yappi (coroutine aware, CPU clock) when it's installed, otherwise with cProfile.
+    Results are printed sorted by own time and saved as a pstats file (snakeviz / python -m pstats).
+    """
+
+    def __init__(self, path: str = "profile.pstats", top: int = 30):
+        self.path = path
+        self.top = top
+        self._profile: cProfile.Profile | None = None
+
+    @property
+    def backend(self) -> str:
+        return "yappi" if yappi else "cProfile"
+
+    def start(self) -> None:
+        if yappi:
+            yappi.clear_stats()
+            yappi.set_clock_type("cpu")
+            yappi.start()
+        else:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+        logger.info(f"Profiling with {self.backend}..")
+
+    def stop(self) -> None:
+        if yappi:
+            yappi.stop()
+            yappi.get_func_stats().save(self.path, type="pstat")
+        else:
+            self._profile.disable()
+            self._profile.dump_stats(self.path)
+
+        output = io.StringIO()
+        stats = pstats.Stats(self.path, stream=output)
+        stats.strip_dirs().sort_stats("tottime").print_stats(self.top)
+        print(output.getvalue())
+
+        logger.success(f"Profile saved to {self.path}")
+
+    def __enter__(self) -> "Profiler":
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.stop()